@@ -1,48 +1,268 @@
+import argparse
+import os
+import sys
+import threading
+import time
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import ttk, messagebox
-from sqlalchemy import create_engine, Column, Integer, String, Float
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
-# Создаем базовый класс для моделей
-Base = declarative_base()
+# Общие модули лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lab_profiler import PROFILER, install_overlay  # noqa: E402
+from db_maintenance import MaintenanceScheduler, MaintenanceTarget, setup_logging  # noqa: E402
 
+# SQLAlchemy и модели загружаются лениво (см. load_orm), чтобы окно появлялось быстрее
+Base = None
+Product = None
 
-# Определяем модель Product
-class Product(Base):
-    __tablename__ = 'products'
+DATABASE_PATH = 'products.db'
+DATABASE_URL = f'sqlite:///{DATABASE_PATH}'
 
-    id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
-    category = Column(String(50))
-    price = Column(Float, nullable=False)
-    quantity = Column(Integer, default=0)
+# Версия схемы и тестовых данных: хранится в PRAGMA user_version
+# (2 - счетчик изменений products для проверки снимка)
+SCHEMA_VERSION = 2
 
-    def __repr__(self):
-        return f"<Product(id={self.id}, name='{self.name}', price={self.price})>"
+# Сколько строк добавлять в таблицу за один проход цикла событий
+INSERT_CHUNK_SIZE = 200
+
+# Сколько результатов запросов хранить в кэше
+RESULT_CACHE_SIZE = 64
+
+# Через сколько мс после последнего изменения пересобирать снимок товаров
+SNAPSHOT_BUILD_DELAY_MS = 2000
+
+
+def load_orm():
+    """Импортируем SQLAlchemy и определяем модели при первом обращении"""
+    global Base, Product
+    if Product is not None:
+        return
+
+    from sqlalchemy import Column, Integer, String, Float
+    from sqlalchemy.ext.declarative import declarative_base
+
+    # Создаем базовый класс для моделей
+    Base = declarative_base()
+
+    # Определяем модель Product
+    class Product(Base):
+        __tablename__ = 'products'
+
+        id = Column(Integer, primary_key=True)
+        name = Column(String(100), nullable=False)
+        category = Column(String(50))
+        price = Column(Float, nullable=False)
+        quantity = Column(Integer, default=0)
+
+        def __repr__(self):
+            return f"<Product(id={self.id}, name='{self.name}', price={self.price})>"
+
+
+class QueryPathStats:
+    """Статистика кэша для одного вида запроса"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.hit_time = 0.0
+        self.miss_time = 0.0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def time_saved(self):
+        """Сэкономленное время, с: попадания против средней стоимости запроса к БД"""
+        if not self.misses:
+            return 0.0
+        return self.hits * (self.miss_time / self.misses) - self.hit_time
+
+
+class ProductQueryCache:
+    """Кэш результатов запросов товаров.
+
+    Ключ - (категория, строка поиска, сортировка, страница). Каждая запись
+    помечается значением счетчика изменений; после записи в БД счетчик
+    увеличивается, и старые записи перестают считаться действительными.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.write_counter = 0
+        self.entries = OrderedDict()
+        self.stats = {}
+
+    def note_write(self):
+        """Отмечаем изменение данных в БД"""
+        self.write_counter += 1
+
+    def get(self, path, key, loader):
+        """Результат из кэша или из loader(); path - вид запроса для статистики"""
+        stats = self.stats.setdefault(path, QueryPathStats())
+        start = time.perf_counter()
+
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == self.write_counter:
+            self.entries.move_to_end(key)
+            stats.hits += 1
+            stats.hit_time += time.perf_counter() - start
+            return entry[1]
+
+        result = loader()
+        self.entries[key] = (self.write_counter, result)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+        stats.misses += 1
+        stats.miss_time += time.perf_counter() - start
+        return result
+
+    def report(self):
+        """Текстовый отчет: доля попаданий и сэкономленное время по видам запросов"""
+        lines = [f"Изменений БД: {self.write_counter}, записей в кэше: {len(self.entries)}"]
+        for path, stats in sorted(self.stats.items()):
+            lines.append(
+                f"{path}: попаданий {stats.hits}, промахов {stats.misses} "
+                f"({stats.hit_rate():.0%}), сэкономлено {stats.time_saved() * 1000:.1f} мс"
+            )
+        return "\n".join(lines)
 
 
 class SQLAlchemyApp:
-    def __init__(self, root):
+    def __init__(self, root, fast_start=True, shard_count=0):
         self.root = root
         self.root.title("SQLAlchemy ORM - Управление товарами")
         self.root.geometry("900x600")
 
+        self.engine = None
+        self.session = None
+        self.shard_count = shard_count
+        self.catalog = None
+        self.migrated_count = None
+        self.snapshots = None
+        self.snapshot_after_id = None
+        self.maintenance = None
+        self.db_error = None
+        self.db_ready = threading.Event()
+        self.fill_token = 0
+        self.query_cache = ProductQueryCache()
+
+        # Создаем GUI
+        self.create_gui()
+
+        if not shard_count:
+            from product_snapshot import SnapshotCache
+            self.snapshots = SnapshotCache(DATABASE_PATH)
+
+        if fast_start:
+            # Окно показывается сразу, БД подключается в фоновом потоке
+            self.stats_label.config(text="Загрузка данных...")
+            self.set_controls_state(False)
+
+            # Если снимок таблицы актуален, показываем товары сразу, не дожидаясь SQLAlchemy
+            snapshot = self.snapshots.current() if self.snapshots is not None else None
+            if snapshot is not None:
+                self.load_products(snapshot.products())
+            threading.Thread(target=self.init_database, daemon=True).start()
+            self.root.after(20, self.wait_for_database)
+        else:
+            self.init_database()
+            self.wait_for_database()
+
+    def init_database(self):
+        """Подключаемся к БД; ошибку передаем в основной поток через db_error"""
+        try:
+            self.connect_database()
+        except Exception as e:
+            self.db_error = e
+        finally:
+            self.db_ready.set()
+
+    @PROFILER.timed("init_database")
+    def connect_database(self):
+        """Подключаемся к БД; схему и тестовые данные создаем только при устаревшем маркере"""
+        if self.shard_count:
+            self.init_catalog()
+            return
+
+        load_orm()
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
         # Создаем engine и сессию SQLAlchemy
-        self.engine = create_engine('sqlite:///products.db')
-        Base.metadata.create_all(self.engine)
+        self.engine = create_engine(DATABASE_URL)
+        PROFILER.attach_sqlalchemy(self.engine)
         Session = sessionmaker(bind=self.engine)
         self.session = Session()
 
-        # Добавляем тестовые данные, если таблица пуста
-        self.add_sample_data()
+        with self.engine.connect() as conn:
+            version = conn.exec_driver_sql("PRAGMA user_version").scalar()
 
-        # Создаем GUI
-        self.create_gui()
+        if version < SCHEMA_VERSION:
+            Base.metadata.create_all(self.engine)
+
+            # Добавляем тестовые данные, если таблица пуста
+            self.add_sample_data()
+
+            from product_snapshot import CHANGE_COUNTER_SQL
+
+            with self.engine.begin() as conn:
+                for sql in CHANGE_COUNTER_SQL:
+                    conn.exec_driver_sql(sql)
+                conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def init_catalog(self):
+        """Шардированный режим: товары в нескольких файлах SQLite, SQLAlchemy не нужен"""
+        from sharded_catalog import ShardedCatalog
 
-        # Загружаем данные
+        self.catalog = ShardedCatalog(self.shard_count)
+
+        # При первом запуске раскладываем товары из обычной БД по шардам (один раз,
+        # отметка хранится в каталоге); id товаров при этом меняются
+        self.migrated_count = self.catalog.migrate(DATABASE_PATH)
+
+    def wait_for_database(self):
+        """Ждем фоновую инициализацию БД, не блокируя цикл событий"""
+        if not self.db_ready.is_set():
+            self.root.after(20, self.wait_for_database)
+            return
+
+        if self.db_error is not None:
+            self.stats_label.config(text="Ошибка подключения к БД")
+            messagebox.showerror("Ошибка", f"Ошибка подключения к БД: {str(self.db_error)}")
+            return
+
+        self.set_controls_state(True)
+
+        # Загружаем категории для фильтра и данные
+        self.load_categories()
         self.load_products()
 
+        # Обслуживание БД (и шардов) во время простоя окна
+        probe_query = "SELECT * FROM products ORDER BY name"
+        paths = [DATABASE_PATH] + (self.catalog.paths if self.catalog is not None else [])
+        self.maintenance = MaintenanceScheduler(
+            self.root, [MaintenanceTarget(path, probe_query) for path in paths if os.path.exists(path)]
+        )
+        self.maintenance.start()
+
+        if self.migrated_count:
+            messagebox.showinfo(
+                "Шардированный каталог",
+                f"Товары ({self.migrated_count}) перенесены из {DATABASE_PATH} в {self.catalog.directory}.\n"
+                "Номер шарда входит в id, поэтому товары получили новые id. "
+                f"{DATABASE_PATH} больше не изменяется в этом режиме."
+            )
+
+    def set_controls_state(self, enabled):
+        """Включаем или отключаем элементы управления"""
+        state = ["!disabled"] if enabled else ["disabled"]
+        for frame in (self.buttons_frame, self.filter_frame):
+            for widget in frame.winfo_children():
+                widget.state(state)
+
     def add_sample_data(self):
         """Добавляем тестовые данные, если таблица пуста"""
         count = self.session.query(Product).count()
@@ -95,15 +315,18 @@ class SQLAlchemyApp:
         # Кнопки управления
         buttons_frame = ttk.Frame(control_frame)
         buttons_frame.grid(row=2, column=0, columnspan=4, pady=(15, 5))
+        self.buttons_frame = buttons_frame
 
         ttk.Button(buttons_frame, text="Добавить", command=self.add_product, width=15).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Обновить", command=self.update_product, width=15).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Удалить", command=self.delete_product, width=15).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Очистить", command=self.clear_form, width=15).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons_frame, text="Отчеты", command=self.export_reports, width=15).pack(side=tk.LEFT, padx=5)
 
         # Панель фильтрации и поиска
         filter_frame = ttk.LabelFrame(main_frame, text="Фильтрация и поиск", padding="10")
         filter_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        self.filter_frame = filter_frame
 
         ttk.Label(filter_frame, text="Категория:").pack(side=tk.LEFT, padx=(0, 5))
         self.category_filter = ttk.Combobox(filter_frame, width=20, state="readonly")
@@ -115,6 +338,7 @@ class SQLAlchemyApp:
         self.search_entry.pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(filter_frame, text="Найти", command=self.search_products, width=10).pack(side=tk.LEFT, padx=5)
         ttk.Button(filter_frame, text="Сбросить", command=self.load_products, width=10).pack(side=tk.LEFT, padx=5)
+        ttk.Button(filter_frame, text="Кэш", command=self.show_cache_stats, width=6).pack(side=tk.LEFT, padx=5)
 
         # Таблица товаров
         table_frame = ttk.LabelFrame(main_frame, text="Список товаров", padding="10")
@@ -155,44 +379,128 @@ class SQLAlchemyApp:
         self.stats_label = ttk.Label(stats_frame, text="")
         self.stats_label.pack(side=tk.LEFT)
 
-        # Загружаем категории для фильтра
-        self.load_categories()
-
+    def query_products(self, category=None, search_term=None):
+        """Товары с фильтром по категории и поиском по названию (через кэш)"""
+        if search_term:
+            path = "search"
+        elif category is not None:
+            path = "category"
+        else:
+            path = "all"
+
+        # Сортировка и страница пока фиксированы: по названию, без разбиения на страницы
+        key = (category, search_term, "name", None)
+        return self.query_cache.get(path, key, lambda: self.fetch_products(category, search_term))
+
+    def fetch_products(self, category=None, search_term=None):
+        """Запрос товаров к БД; lambda_stmt кэширует скомпилированный SQL,
+        значения фильтров передаются связанными параметрами"""
+        if self.catalog is not None:
+            return self.catalog.products(category, search_term)
+
+        # Полный список и фильтр по категории читаются из колоночного снимка, если он
+        # актуален; после изменений - из SQLite, а снимок пересобирается в фоне
+        if self.snapshots is not None and not search_term:
+            snapshot = self.snapshots.current()
+            if snapshot is not None:
+                return snapshot.products(category)
+            self.schedule_snapshot_build()
+
+        from sqlalchemy import lambda_stmt, select
+
+        stmt = lambda_stmt(lambda: select(Product))
+        if category is not None:
+            stmt += lambda s: s.where(Product.category == category)
+        if search_term:
+            pattern = f"%{search_term}%"
+            stmt += lambda s: s.where(Product.name.ilike(pattern))
+        stmt += lambda s: s.order_by(Product.name)
+
+        return self.session.execute(stmt).scalars().all()
+
+    def schedule_snapshot_build(self):
+        """Пересобираем снимок, когда изменения на время прекратятся"""
+        if self.snapshot_after_id is not None:
+            self.root.after_cancel(self.snapshot_after_id)
+        self.snapshot_after_id = self.root.after(SNAPSHOT_BUILD_DELAY_MS, self.build_snapshot)
+
+    def build_snapshot(self):
+        self.snapshot_after_id = None
+        self.snapshots.build_in_background()
+
+    def fetch_categories(self):
+        """Список категорий из БД"""
+        if self.catalog is not None:
+            return self.catalog.categories()
+
+        from sqlalchemy import lambda_stmt, select
+
+        stmt = lambda_stmt(lambda: select(Product.category).distinct())
+        return [category for category in self.session.execute(stmt).scalars() if category]
+
+    def show_cache_stats(self):
+        """Показываем статистику кэша запросов"""
+        messagebox.showinfo("Кэш запросов", self.query_cache.report())
+
+    @PROFILER.timed("load_categories")
     def load_categories(self):
         """Загружаем список категорий для фильтра"""
-        categories = self.session.query(Product.category).distinct().all()
-        category_list = ["Все категории"] + [cat[0] for cat in categories if cat[0]]
+        categories = self.query_cache.get("categories", ("categories",), self.fetch_categories)
+        category_list = ["Все категории"] + categories
         self.category_filter["values"] = category_list
         self.category_filter.current(0)
 
+    @PROFILER.timed("load_products")
     def load_products(self, products=None):
         """Загружаем товары в таблицу"""
         # Очищаем таблицу
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
 
         # Если не переданы товары, загружаем все
+        totals = None
         if products is None:
-            products = self.session.query(Product).order_by(Product.name).all()
-
-        # Добавляем товары в таблицу
-        for product in products:
-            self.tree.insert("", "end", values=(
-                product.id,
-                product.name,
-                product.category,
-                f"{product.price:,.2f}",
-                product.quantity
-            ))
+            products = self.query_products()
+
+            # В шардированном режиме итоги считаются в шардах параллельно
+            if self.catalog is not None:
+                totals = self.query_cache.get("stats", ("stats",), self.catalog.stats)
+
+        with PROFILER.measure("load_products", "rows"):
+            rows = [
+                (product.id, product.name, product.category, f"{product.price:,.2f}", product.quantity)
+                for product in products
+            ]
+
+        # Добавляем товары в таблицу порциями
+        self.fill_token += 1
+        self.insert_rows(rows, 0, self.fill_token)
 
         # Обновляем статистику
-        self.update_stats(products)
+        self.update_stats(products, totals)
+
+    def insert_rows(self, rows, start, token):
+        """Добавляем порцию строк; остальное - на следующих проходах цикла событий"""
+        # Таблицу уже перезагрузили - эта порция устарела
+        if token != self.fill_token:
+            return
+
+        end = start + INSERT_CHUNK_SIZE
+        with PROFILER.measure("load_products", "tree"):
+            for values in rows[start:end]:
+                self.tree.insert("", "end", values=values)
 
-    def update_stats(self, products):
-        """Обновляем статистику"""
-        total_count = len(products)
-        total_value = sum(p.price * p.quantity for p in products)
-        avg_price = sum(p.price for p in products) / total_count if total_count > 0 else 0
+        if end < len(rows):
+            self.root.after(1, self.insert_rows, rows, end, token)
+
+    def update_stats(self, products, totals=None):
+        """Обновляем статистику; totals - готовые (количество, стоимость, средняя цена)"""
+        if totals is not None:
+            total_count, total_value, avg_price = totals
+        else:
+            with PROFILER.measure("load_products", "stats"):
+                total_count = len(products)
+                total_value = sum(p.price * p.quantity for p in products)
+                avg_price = sum(p.price for p in products) / total_count if total_count > 0 else 0
 
         self.stats_label.config(
             text=f"Товаров: {total_count} | "
@@ -213,22 +521,28 @@ class SQLAlchemyApp:
             price = float(self.price_entry.get().strip() or 0)
             quantity = int(self.quantity_entry.get().strip() or 0)
 
-            # Создаем новый продукт
-            new_product = Product(
-                name=name,
-                category=category if category else None,
-                price=price,
-                quantity=quantity
-            )
-
-            # Добавляем в БД
-            self.session.add(new_product)
-            self.session.commit()
+            # Замеряем только работу с БД и таблицей, без диалогов
+            with PROFILER.measure("add_product"):
+                if self.catalog is not None:
+                    self.catalog.add(name, category or None, price, quantity)
+                else:
+                    # Создаем новый продукт
+                    new_product = Product(
+                        name=name,
+                        category=category if category else None,
+                        price=price,
+                        quantity=quantity
+                    )
+
+                    # Добавляем в БД
+                    self.session.add(new_product)
+                    self.session.commit()
+                self.query_cache.note_write()
 
-            # Обновляем таблицу
-            self.load_products()
-            self.clear_form()
-            self.load_categories()  # Обновляем список категорий
+                # Обновляем таблицу
+                self.load_products()
+                self.clear_form()
+                self.load_categories()  # Обновляем список категорий
 
             messagebox.showinfo("Успех", f"Товар '{name}' добавлен успешно!")
 
@@ -237,8 +551,16 @@ class SQLAlchemyApp:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка при добавлении: {str(e)}")
 
+    def database_available(self):
+        """БД подключена: до этого таблица может быть заполнена только из снимка"""
+        return self.db_ready.is_set() and self.db_error is None
+
     def get_selected_product(self):
         """Получаем выбранный товар"""
+        # Двойной клик по строкам из снимка возможен, пока БД еще подключается
+        if not self.database_available():
+            return None
+
         selection = self.tree.selection()
         if not selection:
             messagebox.showwarning("Предупреждение", "Выберите товар из таблицы")
@@ -248,6 +570,8 @@ class SQLAlchemyApp:
         product_id = item["values"][0]
 
         # Находим продукт в БД
+        if self.catalog is not None:
+            return self.catalog.get(product_id)
         product = self.session.query(Product).filter(Product.id == product_id).first()
         return product
 
@@ -258,24 +582,32 @@ class SQLAlchemyApp:
             return
 
         try:
-            # Обновляем данные продукта
-            product.name = self.name_entry.get().strip()
-            product.category = self.category_entry.get().strip() or None
+            name = self.name_entry.get().strip()
+            category = self.category_entry.get().strip() or None
 
             price_str = self.price_entry.get().strip()
             quantity_str = self.quantity_entry.get().strip()
 
-            if price_str:
-                product.price = float(price_str)
-            if quantity_str:
-                product.quantity = int(quantity_str)
+            price = float(price_str) if price_str else product.price
+            quantity = int(quantity_str) if quantity_str else product.quantity
 
-            # Сохраняем изменения
-            self.session.commit()
+            with PROFILER.measure("update_product"):
+                if self.catalog is not None:
+                    self.catalog.update(product.id, name, category, price, quantity)
+                else:
+                    # Обновляем данные продукта
+                    product.name = name
+                    product.category = category
+                    product.price = price
+                    product.quantity = quantity
 
-            # Обновляем таблицу
-            self.load_products()
-            self.load_categories()  # Обновляем список категорий
+                    # Сохраняем изменения
+                    self.session.commit()
+                self.query_cache.note_write()
+
+                # Обновляем таблицу
+                self.load_products()
+                self.load_categories()  # Обновляем список категорий
 
             messagebox.showinfo("Успех", "Товар обновлен успешно!")
 
@@ -292,18 +624,33 @@ class SQLAlchemyApp:
 
         if messagebox.askyesno("Подтверждение", f"Удалить товар '{product.name}'?"):
             try:
-                self.session.delete(product)
-                self.session.commit()
-
-                # Обновляем таблицу
-                self.load_products()
-                self.load_categories()  # Обновляем список категорий
+                with PROFILER.measure("delete_product"):
+                    if self.catalog is not None:
+                        self.catalog.delete(product.id)
+                    else:
+                        self.session.delete(product)
+                        self.session.commit()
+                    self.query_cache.note_write()
+
+                    # Обновляем таблицу
+                    self.load_products()
+                    self.load_categories()  # Обновляем список категорий
 
                 messagebox.showinfo("Успех", "Товар удален успешно!")
 
             except Exception as e:
                 messagebox.showerror("Ошибка", f"Ошибка при удалении: {str(e)}")
 
+    def export_reports(self):
+        """Формируем отчеты по складу в фоновом потоке"""
+        from reports import PRODUCT_REPORTS, run_reports_async
+
+        # Отчеты строятся по файлам, открытым приложением (пути относительно текущего каталога);
+        # в шардированном режиме - по файлам шардов, а не по products.db
+        shards = [os.path.abspath(path) for path in self.catalog.paths] if self.catalog is not None else None
+        run_reports_async(self.root, PRODUCT_REPORTS, lambda text: self.stats_label.config(text=text),
+                          os.path.abspath(DATABASE_PATH), shards)
+
     def on_item_double_click(self, event):
         """Обработка двойного клика по товару"""
         product = self.get_selected_product()
@@ -329,15 +676,14 @@ class SQLAlchemyApp:
         self.price_entry.delete(0, tk.END)
         self.quantity_entry.delete(0, tk.END)
 
+    @PROFILER.timed("filter_by_category")
     def filter_by_category(self, event=None):
         """Фильтруем товары по категории"""
         category = self.category_filter.get()
         if category == "Все категории":
             self.load_products()
         else:
-            products = self.session.query(Product).filter(
-                Product.category == category
-            ).order_by(Product.name).all()
+            products = self.query_products(category=category)
             self.load_products(products)
 
     def search_products(self):
@@ -347,28 +693,52 @@ class SQLAlchemyApp:
             messagebox.showwarning("Предупреждение", "Введите текст для поиска")
             return
 
-        products = self.session.query(Product).filter(
-            Product.name.ilike(f"%{search_term}%")
-        ).order_by(Product.name).all()
+        with PROFILER.measure("search_products"):
+            products = self.query_products(search_term=search_term)
 
-        self.load_products(products)
+            self.load_products(products)
 
         if not products:
             messagebox.showinfo("Результат", "Товары не найдены")
 
     def on_closing(self):
         """Закрываем сессию при выходе"""
-        self.session.close()
+        if self.maintenance is not None:
+            self.maintenance.stop()
+        if self.session is not None:
+            self.session.close()
+        if self.catalog is not None:
+            self.catalog.close()
+        if self.snapshot_after_id is not None:
+            self.root.after_cancel(self.snapshot_after_id)
+        if self.snapshots is not None:
+            self.snapshots.close()
         self.root.destroy()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Управление товарами")
+    parser.add_argument("--sync-start", action="store_true", help="загружать данные до показа окна")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="хранить товары в N файлах SQLite (шардированный режим; "
+                             "не больше 10; N сохраняется в каталоге shards, товары при переносе получают новые id)")
+    args = parser.parse_args()
+
+    setup_logging()
+
     root = tk.Tk()
-    app = SQLAlchemyApp(root)
+    app = SQLAlchemyApp(root, fast_start=not args.sync_start, shard_count=args.shards)
 
     # Обработчик закрытия окна
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
 
+    # Окно профилирования по F12
+    install_overlay(root, "products")
+
+    if os.environ.get("LAB_STARTUP_BENCH"):
+        from startup_benchmark import report_first_paint
+        report_first_paint(root)
+
     root.mainloop()
 
 
@@ -0,0 +1,315 @@
+"""Колоночный снимок таблицы products для мгновенной перезагрузки списка.
+
+Файл снимка:
+    b"PRODSNAP" | длина заголовка (uint32) | JSON-заголовок | колонки
+
+Колонки выровнены по 8 байт и читаются через mmap без копирования:
+id и количество - int64, цена - float64, названия и категории -
+смещения (uint64, count + 1 штук) и общий блок UTF-8. Строки хранятся
+в порядке ORDER BY name. Рядом лежит индекс категория -> номера строк
+(uint32), поэтому фильтр по категории не просматривает весь снимок.
+
+Проверка актуальности:
+  * снимок хранит отпечаток из таблицы products_version: случайное
+    поколение (меняется при пересоздании БД) и счетчик изменений, который
+    увеличивают триггеры на INSERT/UPDATE/DELETE в products. ANALYZE,
+    VACUUM и checkpoint из обслуживания БД снимок не устаревают;
+  * в пределах сеанса сначала сверяется PRAGMA data_version на отдельном
+    соединении (меняется при фиксации транзакций другими соединениями),
+    счетчик читается, только если data_version изменился.
+
+Снимок - ускорение, а не источник данных: если он устарел, список читается
+из SQLite, а новый снимок собирается в фоновом потоке (build_in_background).
+"""
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from array import array
+from collections import namedtuple
+from contextlib import closing
+
+# Товар из снимка или шарда; поля совпадают с моделью Product.
+# Определен здесь, а не в sharded_catalog: снимок читается до первой
+# отрисовки, и multiprocessing на этом пути не нужен
+ProductRow = namedtuple("ProductRow", "id name category price quantity")
+
+SNAPSHOT_PATH = "products.snapshot"
+
+MAGIC = b"PRODSNAP"
+FORMAT_VERSION = 2
+
+# Типы колонок (array typecode)
+ID_TYPE = "q"
+QUANTITY_TYPE = "q"
+PRICE_TYPE = "d"
+OFFSET_TYPE = "Q"
+INDEX_TYPE = "I"
+
+
+# Счетчик изменений таблицы products; создается вместе со схемой БД (10.py)
+CHANGE_COUNTER_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS products_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        generation TEXT NOT NULL,
+        changes INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO products_version VALUES (1, lower(hex(randomblob(8))), 0)",
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_version_{event.lower()} AFTER {event} ON products
+    BEGIN
+        UPDATE products_version SET changes = changes + 1;
+    END
+    """
+    for event in ("INSERT", "UPDATE", "DELETE")
+]
+
+
+def database_stamp(conn):
+    """Отпечаток данных: [поколение, счетчик изменений] или None, если счетчика нет"""
+    try:
+        row = conn.execute("SELECT generation, changes FROM products_version").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return list(row) if row else None
+
+
+def encode_strings(values):
+    """Строки -> (смещения, блок UTF-8); None хранится как пустая строка"""
+    offsets = array(OFFSET_TYPE, [0])
+    blob = bytearray()
+    for value in values:
+        blob += (value or "").encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def write_snapshot(path, rows, stamp):
+    """Записываем снимок строк (id, name, category, price, quantity), упорядоченных по названию"""
+    ids = array(ID_TYPE, (row[0] for row in rows))
+    quantities = array(QUANTITY_TYPE, (row[4] or 0 for row in rows))
+    prices = array(PRICE_TYPE, (row[3] for row in rows))
+    name_offsets, name_blob = encode_strings(row[1] for row in rows)
+    category_offsets, category_blob = encode_strings(row[2] for row in rows)
+
+    # Индекс категорий: номера строк каждой категории подряд
+    rows_by_category = {}
+    for number, row in enumerate(rows):
+        if row[2]:
+            rows_by_category.setdefault(row[2], []).append(number)
+    category_index = array(INDEX_TYPE)
+    categories = {}
+    for category, numbers in rows_by_category.items():
+        categories[category] = [len(category_index), len(numbers)]
+        category_index.extend(numbers)
+
+    sections = [
+        ("ids", ids.tobytes()),
+        ("quantities", quantities.tobytes()),
+        ("prices", prices.tobytes()),
+        ("name_offsets", name_offsets.tobytes()),
+        ("names", name_blob),
+        ("category_offsets", category_offsets.tobytes()),
+        ("categories", category_blob),
+        ("category_index", category_index.tobytes()),
+    ]
+
+    # Смещения колонок считаются от начала области данных
+    layout = {}
+    position = 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += len(data) + (-len(data) % 8)
+
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "stamp": stamp,
+        "count": len(rows),
+        "sections": layout,
+        "category_rows": categories,
+    }, ensure_ascii=False).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    prefix += b"\0" * (-len(prefix) % 8)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        for _, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(tmp_path, path)
+
+
+class ProductSnapshot:
+    """Снимок, отображенный в память"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if self.mm[:len(MAGIC)] != MAGIC:
+                raise ValueError("Неизвестный формат снимка")
+            header_length = struct.unpack_from("<I", self.mm, len(MAGIC))[0]
+            header_end = len(MAGIC) + 4 + header_length
+            header = json.loads(self.mm[len(MAGIC) + 4:header_end].decode("utf-8"))
+            if header["version"] != FORMAT_VERSION:
+                raise ValueError("Неподдерживаемая версия снимка")
+        except Exception:
+            self.mm.close()
+            raise
+
+        self.stamp = header["stamp"]
+        self.count = header["count"]
+        self.category_rows = header["category_rows"]
+
+        data_start = header_end + (-header_end % 8)
+        self.buffer = memoryview(self.mm)
+        self.views = []
+
+        def section(name, typecode=None):
+            start, length = header["sections"][name]
+            view = self.buffer[data_start + start:data_start + start + length]
+            if typecode is not None:
+                view = view.cast(typecode)
+            self.views.append(view)
+            return view
+
+        self.ids = section("ids", ID_TYPE)
+        self.quantities = section("quantities", QUANTITY_TYPE)
+        self.prices = section("prices", PRICE_TYPE)
+        self.name_offsets = section("name_offsets", OFFSET_TYPE)
+        self.names = section("names")
+        self.category_offsets = section("category_offsets", OFFSET_TYPE)
+        self.categories = section("categories")
+        self.category_index = section("category_index", INDEX_TYPE)
+
+    def name(self, number):
+        return str(self.names[self.name_offsets[number]:self.name_offsets[number + 1]], "utf-8")
+
+    def category(self, number):
+        start, end = self.category_offsets[number], self.category_offsets[number + 1]
+        return str(self.categories[start:end], "utf-8") if end > start else None
+
+    def row_numbers(self, category=None):
+        """Номера строк: все или одной категории (по индексу)"""
+        if category is None:
+            return range(self.count)
+        start, length = self.category_rows.get(category, (0, 0))
+        return self.category_index[start:start + length]
+
+    def products(self, category=None):
+        """Товары снимка в порядке названий"""
+        return [
+            ProductRow(self.ids[n], self.name(n), self.category(n), self.prices[n], self.quantities[n])
+            for n in self.row_numbers(category)
+        ]
+
+    def close(self):
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.buffer.release()
+        self.mm.close()
+
+
+class SnapshotCache:
+    """Снимок таблицы products, который пересобирается после изменений в БД"""
+
+    def __init__(self, db_path, snapshot_path=SNAPSHOT_PATH):
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+        self.snapshot = None
+        self.data_version = None
+        self.builder = None
+        # Отдельное соединение: его data_version меняется при фиксации из других соединений
+        self.watcher = sqlite3.connect(db_path)
+
+    def current_data_version(self):
+        return self.watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def current(self):
+        """Действительный снимок или None; сам снимок не пересобирается"""
+        data_version = self.current_data_version()
+        if self.snapshot is not None:
+            if data_version == self.data_version:
+                return self.snapshot
+            # data_version меняют и ANALYZE/VACUUM; данные сверяем по счетчику
+            if self.snapshot.stamp == database_stamp(self.watcher):
+                self.data_version = data_version
+                return self.snapshot
+
+        self.release()
+        if not os.path.exists(self.snapshot_path):
+            return None
+
+        try:
+            snapshot = ProductSnapshot(self.snapshot_path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        stamp = database_stamp(self.watcher)
+        if stamp is None or snapshot.stamp != stamp:
+            snapshot.close()
+            return None
+
+        self.snapshot = snapshot
+        self.data_version = data_version
+        return snapshot
+
+    def get(self):
+        """Снимок; при необходимости пересобираем его сразу (в текущем потоке)"""
+        return self.current() or self.rebuild()
+
+    def rebuild(self):
+        self.release()
+        self.build()
+        return self.current()
+
+    def build(self):
+        """Записываем файл снимка по данным БД; вызывается и из фонового потока.
+
+        Возвращаем False, если в БД нет счетчика изменений и снимок не
+        с чем было бы сверять.
+        """
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            # Строки и отпечаток читаем в одной транзакции, чтобы они соответствовали друг другу
+            conn.execute("BEGIN")
+            stamp = database_stamp(conn)
+            if stamp is None:
+                return False
+            rows = conn.execute(
+                "SELECT id, name, category, price, quantity FROM products ORDER BY name"
+            ).fetchall()
+            conn.commit()
+
+        write_snapshot(self.snapshot_path, rows, stamp)
+        return True
+
+    def build_in_background(self):
+        """Пересобираем снимок в фоновом потоке, если он еще не собирается"""
+        if self.builder is not None and self.builder.is_alive():
+            return
+        self.builder = threading.Thread(target=self.build_quietly, daemon=True)
+        self.builder.start()
+
+    def build_quietly(self):
+        try:
+            self.build()
+        except (OSError, sqlite3.Error):
+            # Снимок только ускоряет загрузку; список по-прежнему читается из SQLite
+            pass
+
+    def release(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def close(self):
+        self.release()
+        self.watcher.close()
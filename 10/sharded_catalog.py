@@ -0,0 +1,297 @@
+"""Шардированный каталог товаров: несколько файлов SQLite вместо одного products.db.
+
+Товар попадает в шард по хэшу категории, поэтому фильтр по категории
+читает ровно один файл. Поиск, полный список и статистика выполняются
+во всех шардах параллельно в ProcessPoolExecutor (по процессу на шард),
+упорядоченные результаты сливаются по названию через heapq.merge.
+
+Идентификатор товара кодирует номер шарда: id % shard_count == номер шарда.
+Поэтому при переносе из обычного products.db товары получают новые id, а
+при смене категории, ведущей в другой шард, товар переезжает с новым id.
+
+В каждом шарде есть таблица catalog_meta: число шардов и номер шарда.
+Открыть каталог с другим числом шардов нельзя (ShardCountMismatch) - иначе
+товары оказались бы не в своих шардах. В нулевом шарде там же хранится
+отметка о выполненном переносе из products.db.
+"""
+import heapq
+import multiprocessing
+import os
+import sqlite3
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from operator import attrgetter
+
+from product_snapshot import ProductRow
+
+SHARDS_DIR = "shards"
+
+# Отчеты (reports.py) подключают все шарды к одному соединению через ATTACH,
+# а SQLite позволяет подключить не больше 10 баз (SQLITE_MAX_ATTACHED)
+MAX_SHARDS = 10
+
+COLUMNS = "id, name, category, price, quantity"
+
+CREATE_META_TABLE = """
+    CREATE TABLE IF NOT EXISTS catalog_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+"""
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        category VARCHAR(50),
+        price FLOAT NOT NULL,
+        quantity INTEGER
+    )
+"""
+
+
+def _query_shard(path, where="", params=()):
+    """Товары одного шарда, упорядоченные по названию (выполняется в процессе-исполнителе)"""
+    with closing(sqlite3.connect(path)) as conn:
+        rows = conn.execute(f"SELECT {COLUMNS} FROM products {where} ORDER BY name", params).fetchall()
+    return [ProductRow(*row) for row in rows]
+
+
+def _stats_shard(path):
+    """Количество, суммарная стоимость и сумма цен товаров одного шарда"""
+    with closing(sqlite3.connect(path)) as conn:
+        return conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(price * quantity), 0), COALESCE(SUM(price), 0) FROM products"
+        ).fetchone()
+
+
+def _categories_shard(path):
+    """Категории одного шарда"""
+    with closing(sqlite3.connect(path)) as conn:
+        return [row[0] for row in conn.execute("SELECT DISTINCT category FROM products WHERE category IS NOT NULL")]
+
+
+class ShardCountMismatch(ValueError):
+    """Каталог уже разбит на другое число шардов"""
+
+
+def read_meta(conn):
+    return dict(conn.execute("SELECT key, value FROM catalog_meta"))
+
+
+class ShardedCatalog:
+    """Каталог товаров, разбитый на shard_count файлов SQLite"""
+
+    def __init__(self, shard_count, directory=SHARDS_DIR):
+        if shard_count < 1:
+            raise ValueError("Количество шардов должно быть положительным")
+        if shard_count > MAX_SHARDS:
+            raise ValueError(f"Количество шардов не может быть больше {MAX_SHARDS} (ограничение ATTACH в SQLite)")
+
+        self.shard_count = shard_count
+        self.directory = directory
+        self.paths = [os.path.join(directory, f"products_{i}.db") for i in range(shard_count)]
+        self.executor = None
+
+        os.makedirs(directory, exist_ok=True)
+        legacy = self.check_shard_count()
+        has_rows = False
+        for shard, path in enumerate(self.paths):
+            with closing(sqlite3.connect(path)) as conn:
+                conn.execute(CREATE_META_TABLE)
+                conn.execute(CREATE_TABLE)
+                conn.execute("CREATE INDEX IF NOT EXISTS ix_products_category ON products (category, name)")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO catalog_meta (key, value) VALUES (?, ?)",
+                    [("shard_count", str(shard_count)), ("shard", str(shard))]
+                )
+                conn.commit()
+                has_rows = has_rows or conn.execute("SELECT 1 FROM products LIMIT 1").fetchone() is not None
+
+        # Шарды, созданные до появления метаданных, уже заполнены переносом
+        if legacy and has_rows:
+            self.mark_migrated("legacy")
+
+    def check_shard_count(self):
+        """Сверяем число шардов с сохраненным в каталоге.
+
+        Возвращаем True, если шарды уже есть, но без метаданных.
+        """
+        first_path = self.paths[0]
+        if os.path.exists(first_path):
+            with closing(sqlite3.connect(first_path)) as conn:
+                conn.execute(CREATE_META_TABLE)
+                stored = read_meta(conn).get("shard_count")
+        else:
+            stored = None
+
+        if stored is None:
+            # Каталог без метаданных: считаем файлы шардов
+            existing = sum(
+                1 for name in os.listdir(self.directory)
+                if name.startswith("products_") and name.endswith(".db")
+            )
+            stored = existing or self.shard_count
+            legacy = existing > 0
+        else:
+            legacy = False
+
+        if int(stored) != self.shard_count:
+            raise ShardCountMismatch(
+                f"Каталог {self.directory} разбит на {stored} шард(ов), а запрошено {self.shard_count}. "
+                f"Запустите с --shards {stored} или удалите каталог, чтобы заново перенести товары из products.db"
+            )
+        return legacy
+
+    def shard_for_category(self, category):
+        """Номер шарда для категории (стабильный между запусками, в отличие от hash())"""
+        if not category:
+            return 0
+        return zlib.crc32(category.encode("utf-8")) % self.shard_count
+
+    def shard_for_id(self, product_id):
+        return product_id % self.shard_count
+
+    def connect(self, shard):
+        return closing(sqlite3.connect(self.paths[shard]))
+
+    def fan_out(self, func, *args):
+        """Выполняем func(путь_шарда, *args) во всех шардах параллельно"""
+        if self.executor is None:
+            # spawn: дочерние процессы не наследуют Tk и фоновые потоки приложения
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.shard_count,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        futures = [self.executor.submit(func, path, *args) for path in self.paths]
+        return [future.result() for future in futures]
+
+    def is_migrated(self):
+        """Выполнялся ли перенос товаров из обычной БД"""
+        with self.connect(0) as conn:
+            return "migrated" in read_meta(conn)
+
+    def migrate(self, path):
+        """Однократно переносим товары из обычного products.db.
+
+        Возвращаем число перенесенных товаров или None, если перенос уже
+        выполнялся. Товары получают новые id (см. import_from).
+        """
+        if self.is_migrated():
+            return None
+        count = self.import_from(path) if os.path.exists(path) else 0
+        self.mark_migrated(str(count))
+        return count
+
+    def mark_migrated(self, value):
+        with self.connect(0) as conn:
+            conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('migrated', ?)", (value,))
+            conn.commit()
+
+    def products(self, category=None, search_term=None):
+        """Товары, упорядоченные по названию"""
+        if category is not None:
+            # Фильтр по категории читает только свой шард
+            where, params = "WHERE category = ?", (category,)
+            if search_term:
+                where += " AND name LIKE ?"
+                params += (f"%{search_term}%",)
+            return _query_shard(self.paths[self.shard_for_category(category)], where, params)
+
+        if search_term:
+            parts = self.fan_out(_query_shard, "WHERE name LIKE ?", (f"%{search_term}%",))
+        else:
+            parts = self.fan_out(_query_shard)
+        return list(heapq.merge(*parts, key=attrgetter("name")))
+
+    def categories(self):
+        categories = set()
+        for part in self.fan_out(_categories_shard):
+            categories.update(part)
+        return sorted(categories)
+
+    def stats(self):
+        """(количество, общая стоимость, средняя цена) по всем шардам"""
+        count = total_value = price_sum = 0
+        for shard_count, shard_value, shard_price_sum in self.fan_out(_stats_shard):
+            count += shard_count
+            total_value += shard_value
+            price_sum += shard_price_sum
+        return count, total_value, price_sum / count if count else 0
+
+    def get(self, product_id):
+        shard = self.shard_for_id(product_id)
+        rows = _query_shard(self.paths[shard], "WHERE id = ?", (product_id,))
+        return rows[0] if rows else None
+
+    def next_id(self, conn, shard):
+        """Следующий свободный id в шарде: id % shard_count == shard"""
+        max_id = conn.execute("SELECT MAX(id) FROM products").fetchone()[0]
+        if max_id is None:
+            return shard
+        return (max_id // self.shard_count + 1) * self.shard_count + shard
+
+    def add(self, name, category, price, quantity):
+        """Добавляем товар; возвращаем его id"""
+        shard = self.shard_for_category(category)
+        with self.connect(shard) as conn:
+            product_id = self.next_id(conn, shard)
+            conn.execute(
+                f"INSERT INTO products ({COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                (product_id, name, category, price, quantity)
+            )
+            conn.commit()
+        return product_id
+
+    def update(self, product_id, name, category, price, quantity):
+        """Обновляем товар; при смене шарда товар переносится с новым id"""
+        shard = self.shard_for_id(product_id)
+        if self.shard_for_category(category) != shard:
+            # Сначала вставка в новый шард: если она не удастся, товар останется в старом
+            new_id = self.add(name, category, price, quantity)
+            self.delete(product_id)
+            return new_id
+
+        with self.connect(shard) as conn:
+            conn.execute(
+                "UPDATE products SET name = ?, category = ?, price = ?, quantity = ? WHERE id = ?",
+                (name, category, price, quantity, product_id)
+            )
+            conn.commit()
+        return product_id
+
+    def delete(self, product_id):
+        with self.connect(self.shard_for_id(product_id)) as conn:
+            conn.execute("DELETE FROM products WHERE id = ?", (product_id,))
+            conn.commit()
+
+    def import_from(self, path):
+        """Раскладываем товары из обычного products.db по шардам.
+
+        Исходные id не сохраняются: новый id должен указывать на шард
+        (id % shard_count), поэтому товары нумеруются заново внутри шарда.
+        """
+        with closing(sqlite3.connect(path)) as source:
+            rows = source.execute(f"SELECT {COLUMNS} FROM products ORDER BY id").fetchall()
+
+        by_shard = [[] for _ in range(self.shard_count)]
+        for _, name, category, price, quantity in rows:
+            by_shard[self.shard_for_category(category)].append((name, category, price, quantity))
+
+        for shard, shard_rows in enumerate(by_shard):
+            if not shard_rows:
+                continue
+            with self.connect(shard) as conn:
+                first_id = self.next_id(conn, shard)
+                conn.executemany(
+                    f"INSERT INTO products ({COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                    [(first_id + i * self.shard_count, *row) for i, row in enumerate(shard_rows)]
+                )
+                conn.commit()
+        return len(rows)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
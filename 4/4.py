@@ -1,27 +1,60 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox
+import os
 import sqlite3
+import sys
+
+# Общие модули лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lab_profiler import PROFILER, install_overlay  # noqa: E402
+from db_maintenance import MaintenanceScheduler, MaintenanceTarget, setup_logging  # noqa: E402
+
+# Версия схемы и тестовых данных: хранится в PRAGMA user_version
+SCHEMA_VERSION = 1
 
 
 class DBUpdateApp:
-    def __init__(self, root):
+    def __init__(self, root, fast_start=True):
         self.root = root
         self.root.title("Обновление записей в БД")
-        self.root.geometry("500x400")
+        self.root.geometry("600x400")
 
         # Подключение к БД
         self.conn = sqlite3.connect("employees.db")
         self.cursor = self.conn.cursor()
+        PROFILER.attach_sqlite(self.conn)
 
-        # Создание таблицы (если не существует)
-        self.create_table()
-
-        # Заполняем тестовыми данными
-        self.insert_test_data()
+        # Создание таблицы и тестовые данные - только если маркер схемы устарел
+        if self.schema_version() < SCHEMA_VERSION:
+            self.create_table()
+            self.insert_test_data()
+            self.set_schema_version(SCHEMA_VERSION)
 
         # Создание GUI
         self.create_widgets()
 
+        # В быстром режиме список загружается после первой отрисовки окна
+        if fast_start:
+            self.root.after_idle(self.load_employees)
+        else:
+            self.load_employees()
+
+        # Обслуживание БД во время простоя окна
+        self.maintenance = MaintenanceScheduler(self.root, [
+            MaintenanceTarget("employees.db", "SELECT id, name FROM employees ORDER BY name")
+        ])
+        self.maintenance.start()
+
+    def schema_version(self):
+        """Текущая версия схемы из PRAGMA user_version"""
+        return self.cursor.execute("PRAGMA user_version").fetchone()[0]
+
+    def set_schema_version(self, version):
+        """Записываем маркер версии схемы"""
+        self.cursor.execute(f"PRAGMA user_version = {int(version)}")
+        self.conn.commit()
+
     def create_table(self):
         """Создание таблицы employees"""
         self.cursor.execute("""
@@ -42,14 +75,10 @@ class DBUpdateApp:
             (3, 'Алексей Иванов', 'Менеджер', 120000)
         ]
 
-        for data in test_data:
-            try:
-                self.cursor.execute(
-                    "INSERT OR IGNORE INTO employees (id, name, position, salary) VALUES (?, ?, ?, ?)",
-                    data
-                )
-            except:
-                pass
+        self.cursor.executemany(
+            "INSERT OR IGNORE INTO employees (id, name, position, salary) VALUES (?, ?, ?, ?)",
+            test_data
+        )
         self.conn.commit()
 
     def create_widgets(self):
@@ -95,30 +124,31 @@ class DBUpdateApp:
         ttk.Button(button_frame, text="Просмотреть все записи", command=self.view_all_records).pack(side=tk.LEFT,
                                                                                                     padx=5)
         ttk.Button(button_frame, text="Очистить поля", command=self.clear_fields).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Отчеты", command=self.export_reports).pack(side=tk.LEFT, padx=5)
 
         # Статус бар
         self.status_bar = ttk.Label(self.root, text="Готово", relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
-        # Загружаем список сотрудников при запуске
-        self.load_employees()
-
     def load_employees(self):
         """Загрузка списка сотрудников в выпадающий список"""
         try:
-            self.cursor.execute("SELECT id, name FROM employees ORDER BY name")
-            employees = self.cursor.fetchall()
-
-            if employees:
-                # Форматируем для отображения: "ID. ФИО"
-                employee_list = [f"{emp[0]}. {emp[1]}" for emp in employees]
-                self.employee_combo['values'] = employee_list
-                self.employee_combo.current(0)
-                self.load_employee_data(None)
-                self.status_bar.config(text=f"Загружено записей: {len(employees)}")
-            else:
-                self.employee_combo['values'] = []
-                self.status_bar.config(text="Нет записей в базе данных")
+            with PROFILER.measure("load_employees"):
+                with PROFILER.measure("load_employees", "sql"):
+                    self.cursor.execute("SELECT id, name FROM employees ORDER BY name")
+                    employees = self.cursor.fetchall()
+
+                if employees:
+                    # Форматируем для отображения: "ID. ФИО"
+                    with PROFILER.measure("load_employees", "rows"):
+                        employee_list = [f"{emp[0]}. {emp[1]}" for emp in employees]
+                    self.employee_combo['values'] = employee_list
+                    self.employee_combo.current(0)
+                    self.load_employee_data(None)
+                    self.status_bar.config(text=f"Загружено записей: {len(employees)}")
+                else:
+                    self.employee_combo['values'] = []
+                    self.status_bar.config(text="Нет записей в базе данных")
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка загрузки данных: {str(e)}")
 
@@ -129,23 +159,25 @@ class DBUpdateApp:
             if not selected:
                 return
 
-            # Извлекаем ID из строки вида "1. Иван Петров"
-            emp_id = int(selected.split('.')[0])
+            with PROFILER.measure("load_employee_data"):
+                # Извлекаем ID из строки вида "1. Иван Петров"
+                emp_id = int(selected.split('.')[0])
 
-            # Получаем данные сотрудника
-            self.cursor.execute("SELECT name, position, salary FROM employees WHERE id = ?", (emp_id,))
-            employee = self.cursor.fetchone()
+                # Получаем данные сотрудника
+                with PROFILER.measure("load_employee_data", "sql"):
+                    self.cursor.execute("SELECT name, position, salary FROM employees WHERE id = ?", (emp_id,))
+                    employee = self.cursor.fetchone()
 
-            if employee:
-                self.name_entry.delete(0, tk.END)
-                self.position_entry.delete(0, tk.END)
-                self.salary_entry.delete(0, tk.END)
+                if employee:
+                    self.name_entry.delete(0, tk.END)
+                    self.position_entry.delete(0, tk.END)
+                    self.salary_entry.delete(0, tk.END)
 
-                self.name_entry.insert(0, employee[0])
-                self.position_entry.insert(0, employee[1])
-                self.salary_entry.insert(0, str(employee[2]))
+                    self.name_entry.insert(0, employee[0])
+                    self.position_entry.insert(0, employee[1])
+                    self.salary_entry.insert(0, str(employee[2]))
 
-                self.status_bar.config(text=f"Загружена запись ID: {emp_id}")
+                    self.status_bar.config(text=f"Загружена запись ID: {emp_id}")
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка загрузки данных сотрудника: {str(e)}")
 
@@ -177,15 +209,18 @@ class DBUpdateApp:
                 messagebox.showerror("Ошибка", "Поле 'ФИО' обязательно для заполнения")
                 return
 
-            # Выполняем обновление
-            self.cursor.execute(
-                "UPDATE employees SET name = ?, position = ?, salary = ? WHERE id = ?",
-                (name, position, salary, emp_id)
-            )
-            self.conn.commit()
+            # Замеряем только работу с БД и виджетами, без диалогов
+            with PROFILER.measure("update_record"):
+                # Выполняем обновление
+                with PROFILER.measure("update_record", "sql"):
+                    self.cursor.execute(
+                        "UPDATE employees SET name = ?, position = ?, salary = ? WHERE id = ?",
+                        (name, position, salary, emp_id)
+                    )
+                    self.conn.commit()
 
-            # Обновляем список сотрудников
-            self.load_employees()
+                # Обновляем список сотрудников
+                self.load_employees()
 
             messagebox.showinfo("Успех", f"Запись ID:{emp_id} успешно обновлена!")
             self.status_bar.config(text=f"Запись ID:{emp_id} обновлена")
@@ -196,43 +231,58 @@ class DBUpdateApp:
     def view_all_records(self):
         """Просмотр всех записей в отдельном окне"""
         try:
-            self.cursor.execute("SELECT * FROM employees ORDER BY id")
-            records = self.cursor.fetchall()
+            with PROFILER.measure("view_all_records"):
+                with PROFILER.measure("view_all_records", "sql"):
+                    self.cursor.execute("SELECT * FROM employees ORDER BY id")
+                    records = self.cursor.fetchall()
+
+                if records:
+                    self.show_records_window(records)
 
             if not records:
                 messagebox.showinfo("Информация", "Нет записей в базе данных")
-                return
-
-            # Создаем новое окно
-            view_window = tk.Toplevel(self.root)
-            view_window.title("Все записи в БД")
-            view_window.geometry("600x300")
-
-            # Создаем Treeview (таблицу)
-            tree = ttk.Treeview(view_window, columns=("ID", "ФИО", "Должность", "Зарплата"), show="headings")
 
-            # Настраиваем заголовки
-            tree.heading("ID", text="ID")
-            tree.heading("ФИО", text="ФИО")
-            tree.heading("Должность", text="Должность")
-            tree.heading("Зарплата", text="Зарплата")
-
-            tree.column("ID", width=50)
-            tree.column("ФИО", width=200)
-            tree.column("Должность", width=150)
-            tree.column("Зарплата", width=100)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка просмотра записей: {str(e)}")
 
-            # Добавляем данные
+    def show_records_window(self, records):
+        """Окно с таблицей всех записей"""
+        # Создаем новое окно
+        view_window = tk.Toplevel(self.root)
+        view_window.title("Все записи в БД")
+        view_window.geometry("600x300")
+
+        # Создаем Treeview (таблицу)
+        tree = ttk.Treeview(view_window, columns=("ID", "ФИО", "Должность", "Зарплата"), show="headings")
+
+        # Настраиваем заголовки
+        tree.heading("ID", text="ID")
+        tree.heading("ФИО", text="ФИО")
+        tree.heading("Должность", text="Должность")
+        tree.heading("Зарплата", text="Зарплата")
+
+        tree.column("ID", width=50)
+        tree.column("ФИО", width=200)
+        tree.column("Должность", width=150)
+        tree.column("Зарплата", width=100)
+
+        # Добавляем данные
+        with PROFILER.measure("view_all_records", "tree"):
             for record in records:
                 tree.insert("", tk.END, values=record)
 
-            tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-            # Статус
-            ttk.Label(view_window, text=f"Всего записей: {len(records)}").pack(pady=5)
+        # Статус
+        ttk.Label(view_window, text=f"Всего записей: {len(records)}").pack(pady=5)
 
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка просмотра записей: {str(e)}")
+    def export_reports(self):
+        """Формируем отчеты по численности и зарплатам в фоновом потоке"""
+        from reports import EMPLOYEE_REPORTS, run_reports_async
+
+        # Отчет строится по той же БД, что открыта приложением (путь относительно текущего каталога)
+        run_reports_async(self.root, EMPLOYEE_REPORTS, lambda text: self.status_bar.config(text=text),
+                          os.path.abspath("employees.db"))
 
     def clear_fields(self):
         """Очистка полей ввода"""
@@ -243,17 +293,31 @@ class DBUpdateApp:
 
     def on_closing(self):
         """Обработчик закрытия окна"""
+        self.maintenance.stop()
         self.conn.close()
         self.root.destroy()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Обновление записей в БД")
+    parser.add_argument("--sync-start", action="store_true", help="загружать данные до показа окна")
+    args = parser.parse_args()
+
+    setup_logging()
+
     root = tk.Tk()
-    app = DBUpdateApp(root)
+    app = DBUpdateApp(root, fast_start=not args.sync_start)
 
     # Обработчик закрытия окна
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
 
+    # Окно профилирования по F12
+    install_overlay(root, "employees")
+
+    if os.environ.get("LAB_STARTUP_BENCH"):
+        from startup_benchmark import report_first_paint
+        report_first_paint(root)
+
     root.mainloop()
 
 
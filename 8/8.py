@@ -1,10 +1,17 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox
+import os
 import sqlite3
+import sys
+
+# Общие модули лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lab_profiler import PROFILER, install_overlay  # noqa: E402
 
 
 class SimpleJoinApp:
-    def __init__(self, root):
+    def __init__(self, root, fast_start=True):
         self.root = root
         self.root.title("JOIN Запросы - Упрощенная версия")
         self.root.geometry("800x500")
@@ -12,6 +19,7 @@ class SimpleJoinApp:
         # Подключение к БД
         self.conn = sqlite3.connect(":memory:")  # В памяти для простоты
         self.cursor = self.conn.cursor()
+        PROFILER.attach_sqlite(self.conn)
 
         # Создаем простые таблицы
         self.create_simple_tables()
@@ -19,6 +27,12 @@ class SimpleJoinApp:
         # GUI
         self.create_gui()
 
+        # В быстром режиме таблицы показываются после первой отрисовки окна
+        if fast_start:
+            self.root.after_idle(self.show_tables)
+        else:
+            self.show_tables()
+
     def create_simple_tables(self):
         """Создаем две простые таблицы для демонстрации JOIN"""
         # Таблица пользователей
@@ -95,45 +109,46 @@ class SimpleJoinApp:
                                       relief=tk.SUNKEN, anchor=tk.W)
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
 
-        # Инициализация
-        self.show_tables()
-
     def execute_query(self, query, query_name):
         """Выполнить запрос и показать результаты"""
+        operation = f"execute_query[{query_name}]"
         try:
-            self.cursor.execute(query)
-            results = self.cursor.fetchall()
-            columns = [desc[0] for desc in self.cursor.description]
-
-            # Очищаем предыдущие результаты
-            self.tree.delete(*self.tree.get_children())
-
-            # Настраиваем колонки
-            self.tree["columns"] = columns
-
-            # Устанавливаем ширину колонок
-            column_widths = {
-                'ID': 80,
-                'Имя': 150,
-                'Отдел': 150,
-                'Таблица': 120,
-                'Название': 150,
-                'ID отдела': 100
-            }
-
-            for col in columns:
-                width = column_widths.get(col, 120)
-                self.tree.heading(col, text=col)
-                self.tree.column(col, width=width, minwidth=80, anchor=tk.W)
-
-            # Добавляем данные
-            for row in results:
-                self.tree.insert("", "end", values=row)
-
-            # Обновляем статус
-            self.status_label.config(
-                text=f"{query_name}: найдено {len(results)} записей"
-            )
+            with PROFILER.measure(operation):
+                with PROFILER.measure(operation, "sql"):
+                    self.cursor.execute(query)
+                    results = self.cursor.fetchall()
+                    columns = [desc[0] for desc in self.cursor.description]
+
+                # Очищаем предыдущие результаты
+                self.tree.delete(*self.tree.get_children())
+
+                # Настраиваем колонки
+                self.tree["columns"] = columns
+
+                # Устанавливаем ширину колонок
+                column_widths = {
+                    'ID': 80,
+                    'Имя': 150,
+                    'Отдел': 150,
+                    'Таблица': 120,
+                    'Название': 150,
+                    'ID отдела': 100
+                }
+
+                for col in columns:
+                    width = column_widths.get(col, 120)
+                    self.tree.heading(col, text=col)
+                    self.tree.column(col, width=width, minwidth=80, anchor=tk.W)
+
+                # Добавляем данные
+                with PROFILER.measure(operation, "tree"):
+                    for row in results:
+                        self.tree.insert("", "end", values=row)
+
+                # Обновляем статус
+                self.status_label.config(
+                    text=f"{query_name}: найдено {len(results)} записей"
+                )
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка выполнения запроса:\n{str(e)}")
@@ -179,8 +194,20 @@ class SimpleJoinApp:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="JOIN запросы")
+    parser.add_argument("--sync-start", action="store_true", help="загружать данные до показа окна")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = SimpleJoinApp(root)
+    app = SimpleJoinApp(root, fast_start=not args.sync_start)
+
+    # Окно профилирования по F12
+    install_overlay(root, "company")
+
+    if os.environ.get("LAB_STARTUP_BENCH"):
+        from startup_benchmark import report_first_paint
+        report_first_paint(root)
+
     root.mainloop()
 
 
@@ -0,0 +1,356 @@
+"""Фоновое обслуживание баз приложений: проверка, статистика, очистка, checkpoint.
+
+Шаги для каждой базы, от дешевых к дорогим:
+  * ANALYZE при первом запуске, дальше PRAGMA optimize (с analysis_limit);
+  * PRAGMA wal_checkpoint(PASSIVE) для баз в режиме WAL;
+  * incremental vacuum порциями (если база еще не в режиме
+    auto_vacuum=INCREMENTAL, небольшой файл один раз переводится в него
+    через VACUUM);
+  * PRAGMA quick_check - со своим бюджетом и не чаще QUICK_CHECK_INTERVAL_SECONDS.
+
+До и после обслуживания в журнал пишутся размер файлов, число свободных
+страниц и время пробного запроса (не более PROBE_ROWS строк).
+
+MaintenanceScheduler запускает обслуживание, когда пользователь не
+трогает окно IDLE_SECONDS. Запросы выполняются в отдельном потоке под
+progress handler: шаг, превысивший бюджет, прерывается и пропускается,
+остальные шаги выполняются; если пользователь вернулся к работе,
+обслуживание прекращается целиком. Поэтому интерфейс не подвисает.
+
+Разовый запуск для всех баз:  python db_maintenance.py
+"""
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from collections import namedtuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+LOG_FILE = "maintenance.log"
+
+# Сколько секунд без действий пользователя считать простоем
+IDLE_SECONDS = 30
+
+# Минимальный интервал между запусками обслуживания, с
+RUN_INTERVAL_SECONDS = 600
+
+# Как часто проверять простой, мс
+CHECK_INTERVAL_MS = 1000
+
+# Бюджет времени на один шаг и на всю базу, с
+STEP_BUDGET_SECONDS = 0.5
+TARGET_BUDGET_SECONDS = 2.0
+
+# quick_check читает весь файл: отдельный бюджет и редкий запуск
+QUICK_CHECK_BUDGET_SECONDS = 5.0
+QUICK_CHECK_INTERVAL_SECONDS = 24 * 3600
+
+# Сколько строк таблицы просматривать ANALYZE (PRAGMA analysis_limit)
+ANALYSIS_LIMIT = 400
+
+# Страниц за один вызов incremental_vacuum
+VACUUM_PAGES_PER_STEP = 256
+
+# Полный VACUUM для включения auto_vacuum делаем только для небольших файлов
+FULL_VACUUM_MAX_BYTES = 16 * 1024 * 1024
+
+# Пробный запрос для замера задержки: сколько раз и сколько строк читать
+PROBE_RUNS = 3
+PROBE_ROWS = 1000
+
+# Как часто вызывать progress handler (в инструкциях виртуальной машины SQLite)
+PROGRESS_OPCODES = 1000
+
+# База для обслуживания и пробный запрос для замера задержки
+MaintenanceTarget = namedtuple("MaintenanceTarget", "path probe_query")
+
+TARGETS = [
+    MaintenanceTarget(os.path.join(ROOT, "4", "employees.db"), "SELECT id, name FROM employees ORDER BY name"),
+    MaintenanceTarget(os.path.join(ROOT, "8", "company.db"),
+                      "SELECT e.emp_name, d.dept_name FROM employees e "
+                      "LEFT JOIN departments d ON e.dept_id = d.dept_id"),
+    MaintenanceTarget(os.path.join(ROOT, "10", "products.db"), "SELECT * FROM products ORDER BY name"),
+]
+
+logger = logging.getLogger("db_maintenance")
+
+
+class BudgetExceeded(Exception):
+    """Шаг обслуживания не уложился в бюджет времени и пропущен"""
+
+
+class Cancelled(Exception):
+    """Пользователь вернулся к работе: обслуживание прекращается"""
+
+
+def file_size(path):
+    """Размер базы вместе с WAL, байт"""
+    size = os.path.getsize(path)
+    wal_path = path + "-wal"
+    if os.path.exists(wal_path):
+        size += os.path.getsize(wal_path)
+    return size
+
+
+class MaintenanceRun:
+    """Одно обслуживание одной базы с бюджетом времени"""
+
+    def __init__(self, target, cancel=None, budget=TARGET_BUDGET_SECONDS, quick_check=True):
+        self.target = target
+        self.cancel = cancel or threading.Event()
+        self.deadline = time.monotonic() + budget
+        self.step_deadline = self.deadline
+        self.run_quick_check = quick_check
+        self.quick_check_ok = False
+        self.actions = []
+
+    def check_budget(self):
+        """progress handler: ненулевой результат прерывает текущий запрос"""
+        return int(self.cancel.is_set() or time.monotonic() > self.step_deadline)
+
+    def step(self, conn, sql, budget=None):
+        """Выполняем запрос в пределах бюджета шага.
+
+        budget=None - общий бюджет шага (не дольше бюджета всей базы);
+        иначе свой бюджет, не зависящий от бюджета базы (quick_check).
+        """
+        if self.cancel.is_set():
+            raise Cancelled(sql)
+        now = time.monotonic()
+        if budget is None:
+            if now > self.deadline:
+                raise BudgetExceeded(sql)
+            self.step_deadline = min(self.deadline, now + STEP_BUDGET_SECONDS)
+        else:
+            self.step_deadline = now + budget
+        try:
+            return conn.execute(sql).fetchall()
+        except sqlite3.OperationalError as e:
+            if "interrupted" not in str(e):
+                raise
+            if self.cancel.is_set():
+                raise Cancelled(sql) from e
+            raise BudgetExceeded(sql) from e
+        finally:
+            self.step_deadline = self.deadline
+
+    def pragma(self, conn, name):
+        return self.step(conn, f"PRAGMA {name}")[0][0]
+
+    def probe_latency(self, conn):
+        """Медиана времени пробного запроса (не более PROBE_ROWS строк), мс; None - не уложился"""
+        query = f"SELECT COUNT(*) FROM ({self.target.probe_query} LIMIT {PROBE_ROWS})"
+        timings = []
+        try:
+            for _ in range(PROBE_RUNS):
+                start = time.perf_counter()
+                self.step(conn, query, STEP_BUDGET_SECONDS)
+                timings.append((time.perf_counter() - start) * 1000)
+        except BudgetExceeded:
+            return None
+        return statistics.median(timings)
+
+    def measure(self, conn, probe=True):
+        return {
+            "size": file_size(self.target.path),
+            "freelist": self.step(conn, "PRAGMA freelist_count", STEP_BUDGET_SECONDS)[0][0],
+            "probe_ms": self.probe_latency(conn) if probe else None,
+        }
+
+    def run(self):
+        """Обслуживаем базу; возвращаем строку для журнала"""
+        name = os.path.basename(self.target.path)
+        steps = [
+            ("optimize", self.optimize),
+            ("checkpoint", self.checkpoint),
+            ("incremental_vacuum", self.incremental_vacuum),
+        ]
+        if self.run_quick_check:
+            steps.append(("quick_check", self.quick_check))
+
+        conn = sqlite3.connect(self.target.path, timeout=1, isolation_level=None)
+        conn.set_progress_handler(self.check_budget, PROGRESS_OPCODES)
+        before = after = None
+        try:
+            before = self.measure(conn)
+            for step_name, action in steps:
+                try:
+                    action(conn)
+                except BudgetExceeded:
+                    self.actions.append(f"{step_name} пропущен (не уложился в бюджет)")
+                except sqlite3.Error as e:
+                    self.actions.append(f"{step_name}: ошибка: {e}")
+            after = self.measure(conn)
+        except Cancelled:
+            self.actions.append("прервано")
+        finally:
+            conn.close()
+
+        if before is None:
+            return f"{name}: " + ", ".join(self.actions)
+        if after is None:
+            after = {"size": file_size(self.target.path), "freelist": before["freelist"], "probe_ms": None}
+        return (
+            f"{name}: размер {before['size']} -> {after['size']} байт, "
+            f"свободных страниц {before['freelist']} -> {after['freelist']}, "
+            f"пробный запрос {format_ms(before['probe_ms'])} -> {format_ms(after['probe_ms'])} мс; "
+            + ", ".join(self.actions)
+        )
+
+    def quick_check(self, conn):
+        result = [row[0] for row in self.step(conn, "PRAGMA quick_check", QUICK_CHECK_BUDGET_SECONDS)]
+        if result == ["ok"]:
+            self.quick_check_ok = True
+            self.actions.append("quick_check ok")
+        else:
+            self.actions.append(f"quick_check: {'; '.join(result)}")
+            logger.warning("%s: quick_check: %s", self.target.path, result)
+
+    def optimize(self, conn):
+        # Ограничиваем выборку ANALYZE, чтобы шаг укладывался в бюджет на больших таблицах
+        self.step(conn, f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        has_stats = self.step(conn, "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if has_stats:
+            self.step(conn, "PRAGMA optimize")
+            self.actions.append("optimize")
+        else:
+            self.step(conn, "ANALYZE")
+            self.actions.append("analyze")
+
+    def incremental_vacuum(self, conn):
+        freelist = self.pragma(conn, "freelist_count")
+        if self.pragma(conn, "auto_vacuum") != 2:
+            # Режим auto_vacuum меняется только полным VACUUM
+            if file_size(self.target.path) > FULL_VACUUM_MAX_BYTES:
+                self.actions.append("vacuum пропущен (auto_vacuum выключен, файл большой)")
+                return
+            self.step(conn, "PRAGMA auto_vacuum = INCREMENTAL")
+            self.step(conn, "VACUUM")
+            self.actions.append(f"vacuum (auto_vacuum=INCREMENTAL), освобождено {freelist} стр.")
+            return
+
+        # Освобождаем страницы порциями, пока хватает бюджета базы
+        remaining = freelist
+        try:
+            while remaining > 0:
+                self.step(conn, f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})")
+                left = self.pragma(conn, "freelist_count")
+                if left >= remaining:
+                    break
+                remaining = left
+        except BudgetExceeded:
+            self.actions.append(f"incremental_vacuum {freelist - remaining} стр. (остальное при следующем запуске)")
+            return
+        self.actions.append(f"incremental_vacuum {freelist - remaining} стр.")
+
+    def checkpoint(self, conn):
+        journal_mode = self.pragma(conn, "journal_mode")
+        if journal_mode != "wal":
+            self.actions.append(f"checkpoint не нужен (journal_mode={journal_mode})")
+            return
+        busy, log_frames, checkpointed = self.step(conn, "PRAGMA wal_checkpoint(PASSIVE)")[0]
+        self.actions.append(f"checkpoint {checkpointed}/{log_frames} кадров")
+
+
+def format_ms(value):
+    return "н/д" if value is None else f"{value:.2f}"
+
+
+def run_maintenance(targets, cancel=None, quick_checks=None):
+    """Обслуживаем базы по очереди; возвращаем строки журнала.
+
+    quick_checks - {путь: время последнего успешного quick_check}; если
+    передан, quick_check выполняется не чаще QUICK_CHECK_INTERVAL_SECONDS
+    (без него - при каждом запуске).
+    """
+    lines = []
+    for target in targets:
+        if cancel is not None and cancel.is_set():
+            break
+        if not os.path.exists(target.path):
+            continue
+        due = quick_checks is None or time.time() - quick_checks.get(target.path, 0) >= QUICK_CHECK_INTERVAL_SECONDS
+        try:
+            run = MaintenanceRun(target, cancel, quick_check=due)
+            line = run.run()
+            if run.quick_check_ok and quick_checks is not None:
+                quick_checks[target.path] = time.time()
+        except sqlite3.Error as e:
+            line = f"{os.path.basename(target.path)}: ошибка: {e}"
+        logger.info(line)
+        lines.append(line)
+    return lines
+
+
+class MaintenanceScheduler:
+    """Запускает обслуживание баз, когда окно простаивает"""
+
+    def __init__(self, root, targets, idle_seconds=IDLE_SECONDS, interval_seconds=RUN_INTERVAL_SECONDS):
+        self.root = root
+        self.targets = targets
+        self.idle_seconds = idle_seconds
+        self.interval_seconds = interval_seconds
+        self.last_activity = time.monotonic()
+        self.last_run = None
+        self.quick_checks = {}
+        self.worker = None
+        self.cancel = threading.Event()
+        self.after_id = None
+
+    def start(self):
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>", "<Motion>", "<MouseWheel>"):
+            self.root.bind_all(sequence, self.on_activity, add="+")
+        self.after_id = self.root.after(CHECK_INTERVAL_MS, self.check)
+
+    def stop(self):
+        self.cancel.set()
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def on_activity(self, event=None):
+        self.last_activity = time.monotonic()
+        # Пользователь вернулся - прерываем обслуживание
+        if self.worker is not None:
+            self.cancel.set()
+
+    def check(self):
+        """Проверяем простой и состояние фонового обслуживания"""
+        now = time.monotonic()
+        if self.worker is not None and not self.worker.is_alive():
+            self.worker = None
+
+        idle = now - self.last_activity >= self.idle_seconds
+        due = self.last_run is None or now - self.last_run >= self.interval_seconds
+        if self.worker is None and idle and due:
+            self.last_run = now
+            self.cancel.clear()
+            self.worker = threading.Thread(
+                target=run_maintenance, args=(self.targets, self.cancel, self.quick_checks), daemon=True
+            )
+            self.worker.start()
+
+        self.after_id = self.root.after(CHECK_INTERVAL_MS, self.check)
+
+
+def setup_logging(path=LOG_FILE):
+    """Журнал обслуживания в файл"""
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def main():
+    setup_logging(os.path.join(ROOT, LOG_FILE))
+    for line in run_maintenance(TARGETS):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Профилирование горячих путей приложений 4, 8 и 10.
+
+Замеры ведутся по операциям и их фазам: "load_products" - вся операция,
+"load_products/sql" - время SQL, "load_products/rows" - обработка строк
+в Python, "load_products/tree" - вставка в Treeview.
+
+    with PROFILER.measure("load_employees"):
+        with PROFILER.measure("load_employees", "sql"):
+            ...
+
+SQL-время собирается автоматически: для SQLAlchemy - через события
+before/after_cursor_execute (attach_sqlalchemy), для sqlite3 трассировка
+запросов идет через set_trace_callback (attach_sqlite).
+
+Окно со статистикой открывается по F12 (install_overlay); из него можно
+сохранить JSON и включить/выключить cProfile.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tkinter as tk
+from collections import deque
+from contextlib import contextmanager
+from tkinter import ttk, messagebox
+
+# Сколько последних SQL-запросов хранить в журнале
+SQL_LOG_SIZE = 200
+
+# Период обновления окна статистики, мс
+OVERLAY_REFRESH_MS = 500
+
+# Каталог для JSON-отчетов и дампов cProfile
+PROFILES_DIR = "profiles"
+
+
+class OperationStats:
+    """Накопленные замеры одной операции или фазы"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed, failed=False):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if failed:
+            self.errors += 1
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Profiler:
+    """Сборщик замеров по операциям"""
+
+    def __init__(self):
+        self.stats = {}
+        self.sql_log = deque(maxlen=SQL_LOG_SIZE)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.cprofile = None
+
+    def current_operation(self):
+        """Самая вложенная операция текущего потока"""
+        stack = getattr(self.local, "stack", None)
+        return stack[-1] if stack else None
+
+    def record(self, name, elapsed, failed=False):
+        with self.lock:
+            self.stats.setdefault(name, OperationStats()).add(elapsed, failed)
+
+    @contextmanager
+    def measure(self, operation, phase=None):
+        """Замер операции (или ее фазы, если указан phase)"""
+        name = f"{operation}/{phase}" if phase else operation
+        stack = self.local.__dict__.setdefault("stack", [])
+        if phase is None:
+            stack.append(operation)
+
+        failed = False
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, failed)
+            if phase is None:
+                stack.pop()
+
+    def timed(self, operation):
+        """Декоратор: замер каждого вызова функции как операции.
+
+        Не подходит для обработчиков, которые показывают messagebox или сами
+        перехватывают исключения: в замер попадет время чтения диалога, а
+        ошибки не будут засчитаны. Там measure() ставится внутри try вокруг
+        работы с БД и виджетами, тогда исключение проходит через замер."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.measure(operation):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def log_sql(self, statement, elapsed=None, failed=False):
+        """Запись SQL-запроса в журнал и в фазу sql текущей операции"""
+        operation = self.current_operation()
+        self.sql_log.append({
+            "operation": operation,
+            "statement": " ".join(statement.split()),
+            "ms": round(elapsed * 1000, 3) if elapsed is not None else None,
+            "failed": failed,
+        })
+        if elapsed is not None:
+            self.record(f"{operation}/sql" if operation else "sql", elapsed, failed)
+
+    def attach_sqlite(self, conn):
+        """Трассировка запросов sqlite3 (время запросов замеряется фазой sql)"""
+        conn.set_trace_callback(self.log_sql)
+
+    def attach_sqlalchemy(self, engine):
+        """Замер времени каждого запроса SQLAlchemy, в том числе завершившихся ошибкой"""
+        from sqlalchemy import event
+
+        # Время начала хранится в контексте выполнения: при ошибке after_cursor_execute
+        # не вызывается, и стек на соединении из пула остался бы с лишней записью
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context.profiler_start = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.log_sql(statement, time.perf_counter() - context.profiler_start)
+
+        def handle_error(exception_context):
+            context = exception_context.execution_context
+            start = getattr(context, "profiler_start", None)
+            if start is not None and exception_context.statement is not None:
+                self.log_sql(exception_context.statement, time.perf_counter() - start, failed=True)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
+
+    def snapshot(self):
+        """Копия статистики: {имя: словарь замеров}"""
+        with self.lock:
+            return {name: stats.as_dict() for name, stats in sorted(self.stats.items())}
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+        self.sql_log.clear()
+
+    def export_json(self, path):
+        """Сохраняем статистику и журнал SQL в JSON"""
+        data = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "operations": self.snapshot(),
+            "sql": list(self.sql_log),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def toggle_cprofile(self, path):
+        """Включаем cProfile или выключаем и сохраняем дамп в path.
+        Возвращает True, если профилирование включено."""
+        import cProfile
+
+        if self.cprofile is None:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+            return True
+
+        self.cprofile.disable()
+        self.cprofile.dump_stats(path)
+        self.cprofile = None
+        return False
+
+
+# Общий профилировщик приложения
+PROFILER = Profiler()
+
+
+class ProfilerOverlay:
+    """Окно со статистикой замеров, переключается по F12"""
+
+    def __init__(self, root, profiler=PROFILER, name="profile"):
+        self.root = root
+        self.profiler = profiler
+        self.name = name
+        self.window = None
+
+    def toggle(self, event=None):
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+            return
+
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Профилирование")
+        self.window.geometry("620x320")
+        self.window.protocol("WM_DELETE_WINDOW", self.toggle)
+
+        columns = ("name", "count", "total", "avg", "max", "errors")
+        self.tree = ttk.Treeview(self.window, columns=columns, show="headings")
+        for col, text, width in (
+            ("name", "Операция", 220),
+            ("count", "Вызовов", 70),
+            ("total", "Всего, мс", 90),
+            ("avg", "Среднее, мс", 90),
+            ("max", "Макс, мс", 80),
+            ("errors", "Ошибок", 60),
+        ):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, anchor=tk.W if col == "name" else tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        buttons = ttk.Frame(self.window)
+        buttons.pack(fill=tk.X, padx=5, pady=(0, 5))
+        ttk.Button(buttons, text="Сохранить JSON", command=self.export_json).pack(side=tk.LEFT, padx=5)
+        self.cprofile_button = ttk.Button(buttons, command=self.toggle_cprofile)
+        self.cprofile_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Сбросить", command=self.profiler.reset).pack(side=tk.LEFT, padx=5)
+        self.update_cprofile_button()
+
+        self.refresh()
+
+    def refresh(self):
+        """Перерисовываем таблицу, пока окно открыто"""
+        if self.window is None:
+            return
+
+        self.tree.delete(*self.tree.get_children())
+        for name, stats in self.profiler.snapshot().items():
+            self.tree.insert("", "end", values=(
+                name,
+                stats["count"],
+                f"{stats['total_ms']:.1f}",
+                f"{stats['avg_ms']:.2f}",
+                f"{stats['max_ms']:.2f}",
+                stats["errors"],
+            ))
+        self.window.after(OVERLAY_REFRESH_MS, self.refresh)
+
+    def output_path(self, extension):
+        """Путь для нового файла отчета"""
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        return os.path.join(PROFILES_DIR, f"{self.name}_{time.strftime('%Y%m%d_%H%M%S')}.{extension}")
+
+    def export_json(self):
+        path = self.output_path("json")
+        try:
+            self.profiler.export_json(path)
+            messagebox.showinfo("Профилирование", f"Статистика сохранена в {path}", parent=self.window)
+        except OSError as e:
+            messagebox.showerror("Ошибка", f"Ошибка сохранения: {str(e)}", parent=self.window)
+
+    def toggle_cprofile(self):
+        path = self.output_path("prof")
+        if not self.profiler.toggle_cprofile(path):
+            messagebox.showinfo("Профилирование", f"Дамп cProfile сохранен в {path}", parent=self.window)
+        self.update_cprofile_button()
+
+    def update_cprofile_button(self):
+        running = self.profiler.cprofile is not None
+        self.cprofile_button.config(text="Остановить cProfile" if running else "Запустить cProfile")
+
+
+def install_overlay(root, name, profiler=PROFILER):
+    """Привязываем окно статистики к клавише F12"""
+    overlay = ProfilerOverlay(root, profiler, name)
+    root.bind("<F12>", overlay.toggle)
+    return overlay
@@ -0,0 +1,316 @@
+"""Отчеты по складу и персоналу: products.db, employees.db, company.db.
+
+Каждый отчет - агрегирующий SQL-запрос. Строки читаются курсором порциями
+и сразу пишутся генераторами в CSV/HTML, поэтому память не зависит от
+размера таблиц. Отчеты выполняются параллельно в пуле потоков, у каждого
+свое соединение (только чтение).
+
+Если товары хранятся в шардах (10.py --shards), отчеты по товарам строятся
+по файлам шардов: они подключаются через ATTACH и объединяются временным
+представлением products, поэтому запросы отчетов не меняются.
+
+Из GUI отчеты запускаются через run_reports_async, чтобы не блокировать окно.
+
+Запуск:  python reports.py [--format csv|html|all] [--out DIR] [--low-stock N]
+                           [--product-shards DIR] [отчет ...]
+"""
+import argparse
+import csv
+import glob
+import html
+import io
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import pathname2url
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Базы по умолчанию для запуска из командной строки; приложения передают свои пути
+PRODUCTS_DB = os.path.join(ROOT, "10", "products.db")
+EMPLOYEES_DB = os.path.join(ROOT, "4", "employees.db")
+COMPANY_DB = os.path.join(ROOT, "8", "company.db")
+
+REPORTS_DIR = "reports"
+
+# Сколько строк читать из курсора за раз
+FETCH_SIZE = 500
+
+# Порог "мало на складе" по умолчанию
+LOW_STOCK_THRESHOLD = 10
+
+Report = namedtuple("Report", "name title database query columns")
+
+REPORTS = [
+    Report(
+        "inventory_by_category",
+        "Стоимость склада по категориям",
+        PRODUCTS_DB,
+        """
+        SELECT COALESCE(category, 'Без категории'), COUNT(*), SUM(quantity),
+               SUM(price * quantity), AVG(price)
+        FROM products
+        GROUP BY category
+        ORDER BY SUM(price * quantity) DESC
+        """,
+        ("Категория", "Товаров", "Количество", "Стоимость", "Средняя цена"),
+    ),
+    Report(
+        "inventory_by_price_band",
+        "Товары по ценовым диапазонам",
+        PRODUCTS_DB,
+        """
+        SELECT CASE
+                   WHEN price < 1000 THEN 'до 1 000'
+                   WHEN price < 5000 THEN '1 000 - 5 000'
+                   WHEN price < 20000 THEN '5 000 - 20 000'
+                   ELSE 'от 20 000'
+               END AS band,
+               COUNT(*), SUM(quantity), SUM(price * quantity)
+        FROM products
+        GROUP BY band
+        ORDER BY MIN(price)
+        """,
+        ("Диапазон цен", "Товаров", "Количество", "Стоимость"),
+    ),
+    Report(
+        "low_stock",
+        "Товары с малым остатком",
+        PRODUCTS_DB,
+        """
+        SELECT id, name, COALESCE(category, ''), quantity, price
+        FROM products
+        WHERE quantity < :low_stock
+        ORDER BY quantity, name
+        """,
+        ("ID", "Название", "Категория", "Количество", "Цена"),
+    ),
+    Report(
+        "headcount_by_position",
+        "Численность и фонд оплаты по должностям",
+        EMPLOYEES_DB,
+        """
+        SELECT COALESCE(position, 'Не указана'), COUNT(*), SUM(salary), AVG(salary)
+        FROM employees
+        GROUP BY position
+        ORDER BY SUM(salary) DESC
+        """,
+        ("Должность", "Сотрудников", "Фонд оплаты", "Средняя зарплата"),
+    ),
+    Report(
+        "headcount_by_department",
+        "Численность и фонд оплаты по отделам",
+        COMPANY_DB,
+        """
+        SELECT COALESCE(d.dept_name, 'Нет отдела'), COUNT(e.emp_id),
+               COALESCE(SUM(e.salary), 0), AVG(e.salary)
+        FROM employees e
+        LEFT JOIN departments d ON e.dept_id = d.dept_id
+        GROUP BY d.dept_id
+        ORDER BY COUNT(e.emp_id) DESC
+        """,
+        ("Отдел", "Сотрудников", "Фонд оплаты", "Средняя зарплата"),
+    ),
+]
+
+REPORTS_BY_NAME = {report.name: report for report in REPORTS}
+
+# Отчеты по приложениям (для кнопок в GUI)
+PRODUCT_REPORTS = ["inventory_by_category", "inventory_by_price_band", "low_stock"]
+EMPLOYEE_REPORTS = ["headcount_by_position"]
+
+
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def readonly_uri(path):
+    return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+
+def connect_readonly(database, shards=None):
+    """Соединение только для чтения; для шардов - общее представление products.
+
+    Шардов не больше 10 (SQLITE_MAX_ATTACHED), это проверяет ShardedCatalog.
+    """
+    if not shards:
+        return sqlite3.connect(readonly_uri(database), uri=True)
+
+    conn = sqlite3.connect(":memory:", uri=True)
+    selects = []
+    for number, path in enumerate(shards):
+        conn.execute(f"ATTACH DATABASE ? AS shard_{number}", (readonly_uri(path),))
+        selects.append(f"SELECT id, name, category, price, quantity FROM shard_{number}.products")
+    conn.execute("CREATE TEMP VIEW products AS " + " UNION ALL ".join(selects))
+    return conn
+
+
+def stream_rows(database, query, params, shards=None):
+    """Строки запроса порциями по FETCH_SIZE; соединение только для чтения"""
+    conn = connect_readonly(database, shards)
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def csv_chunks(columns, rows):
+    """CSV построчно"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([format_value(value) for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def html_chunks(title, columns, rows):
+    """HTML-таблица построчно"""
+    yield (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(title)}</title></head><body>\n"
+        f"<h1>{html.escape(title)}</h1>\n"
+        f"<p>Сформирован: {time.strftime('%Y-%m-%d %H:%M:%S')}</p>\n<table border=\"1\">\n"
+        "<tr>" + "".join(f"<th>{html.escape(col)}</th>" for col in columns) + "</tr>\n"
+    )
+    for row in rows:
+        yield "<tr>" + "".join(f"<td>{html.escape(format_value(value))}</td>" for value in row) + "</tr>\n"
+    yield "</table>\n</body></html>\n"
+
+
+WRITERS = {
+    "csv": lambda report, rows: csv_chunks(report.columns, rows),
+    "html": lambda report, rows: html_chunks(report.title, report.columns, rows),
+}
+
+
+def run_report(report, fmt, out_dir, params, database=None, shards=None):
+    """Формируем один отчет; возвращаем (путь, число строк)"""
+    path = os.path.join(out_dir, f"{report.name}.{fmt}")
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    rows = counted(stream_rows(database or report.database, report.query, params, shards))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in WRITERS[fmt](report, rows):
+            f.write(chunk)
+    return path, count
+
+
+def generate_reports(names=None, formats=("csv", "html"), out_dir=REPORTS_DIR,
+                     low_stock=LOW_STOCK_THRESHOLD, max_workers=4, database=None, product_shards=None):
+    """Формируем отчеты параллельно; возвращаем [(путь, число строк)].
+
+    database - путь к БД вместо указанного в отчетах (приложение передает
+    файл, который оно открыло); product_shards - файлы шардов товаров,
+    если заданы, отчеты по товарам строятся по ним.
+    """
+    reports = [REPORTS_BY_NAME[name] for name in names] if names else REPORTS
+    params = {"low_stock": low_stock}
+    os.makedirs(out_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(run_report, report, fmt, out_dir, params, database,
+                            product_shards if report.database == PRODUCTS_DB else None)
+            for report in reports
+            for fmt in formats
+        ]
+        return [future.result() for future in futures]
+
+
+def run_reports_async(root, names, on_status, database=None, product_shards=None, out_dir=REPORTS_DIR):
+    """Формируем отчеты в фоновом потоке, не блокируя окно Tk.
+
+    on_status(текст) вызывается в основном потоке при запуске и окончании;
+    результат или ошибка показываются диалогом.
+    """
+    from tkinter import messagebox
+
+    result = {}
+
+    def run():
+        try:
+            result["paths"] = generate_reports(
+                names, out_dir=out_dir, database=database, product_shards=product_shards
+            )
+        except Exception as e:
+            result["error"] = e
+
+    def wait():
+        if worker.is_alive():
+            root.after(100, wait)
+            return
+
+        if "error" in result:
+            on_status("Ошибка формирования отчетов")
+            messagebox.showerror("Ошибка", f"Ошибка формирования отчетов: {str(result['error'])}")
+            return
+
+        on_status(f"Отчеты сохранены: {len(result['paths'])} файлов")
+        messagebox.showinfo("Отчеты", f"Отчеты сохранены в каталог {os.path.abspath(out_dir)}")
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    on_status("Формирование отчетов...")
+    root.after(100, wait)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Отчеты по складу и персоналу")
+    parser.add_argument("reports", nargs="*",
+                        help="какие отчеты формировать (по умолчанию все): " + ", ".join(REPORTS_BY_NAME))
+    parser.add_argument("--format", choices=["csv", "html", "all"], default="all")
+    parser.add_argument("--out", default=REPORTS_DIR, help="каталог для отчетов")
+    parser.add_argument("--low-stock", type=int, default=LOW_STOCK_THRESHOLD,
+                        help="порог малого остатка")
+    parser.add_argument("--product-shards", metavar="DIR",
+                        help="каталог шардов товаров (10.py --shards); отчеты по товарам строятся по нему")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.reports if name not in REPORTS_BY_NAME]
+    if unknown:
+        parser.error(f"неизвестные отчеты: {', '.join(unknown)}")
+
+    product_shards = None
+    if args.product_shards:
+        product_shards = sorted(glob.glob(os.path.join(args.product_shards, "products_*.db")))
+        if not product_shards:
+            parser.error(f"в каталоге {args.product_shards} нет шардов products_*.db")
+
+    formats = ("csv", "html") if args.format == "all" else (args.format,)
+    try:
+        results = generate_reports(args.reports, formats, args.out, args.low_stock,
+                                   product_shards=product_shards)
+    except sqlite3.Error as e:
+        print(f"Ошибка формирования отчетов: {e}", file=sys.stderr)
+        return 1
+
+    for path, count in results:
+        print(f"{path}: строк {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
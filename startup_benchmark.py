@@ -0,0 +1,148 @@
+"""Замер времени запуска приложений 4, 8 и 10.
+
+Для каждого приложения измеряется:
+  * время импортов (python -X importtime), самые медленные модули;
+  * время до первой отрисовки окна (от запуска процесса до события <Map>).
+
+Запуск:  python startup_benchmark.py [--runs N] [--sync-start]
+Код возврата 1, если время до первой отрисовки превышает бюджет.
+"""
+import argparse
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Приложения: (каталог, скрипт)
+APPS = [
+    ("4", "4.py"),
+    ("8", "8.py"),
+    ("10", "10.py"),
+]
+
+# Бюджет времени до первой отрисовки, мс
+FIRST_PAINT_BUDGET_MS = 400
+
+# Сколько самых медленных импортов показывать
+TOP_IMPORTS = 5
+
+# Строка, которую приложение печатает при первой отрисовке
+FIRST_PAINT_MARKER = "FIRST_PAINT"
+
+# Сколько ждать первой отрисовки, прежде чем завершить зависшее приложение, с
+FIRST_PAINT_TIMEOUT_SECONDS = 30
+
+
+def report_first_paint(root):
+    """Вызывается приложением при LAB_STARTUP_BENCH=1: сообщаем о первой отрисовке и выходим"""
+    def on_map(event):
+        if event.widget is root:
+            root.update_idletasks()
+            print(FIRST_PAINT_MARKER, flush=True)
+            root.after_idle(root.destroy)
+
+    root.bind("<Map>", on_map, add="+")
+
+
+def measure_first_paint(app_dir, script, extra_args):
+    """Время от запуска процесса до первой отрисовки окна, мс"""
+    env = dict(os.environ, LAB_STARTUP_BENCH="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, script, *extra_args],
+        cwd=os.path.join(ROOT, app_dir),
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    # stdout читаем в отдельном потоке, чтобы ожидание маркера было ограничено по времени
+    painted = queue.Queue()
+
+    def read_output():
+        for line in proc.stdout:
+            if line.strip() == FIRST_PAINT_MARKER:
+                painted.put((time.perf_counter() - start) * 1000)
+                return
+
+    threading.Thread(target=read_output, daemon=True).start()
+    try:
+        elapsed = painted.get(timeout=FIRST_PAINT_TIMEOUT_SECONDS)
+    except queue.Empty:
+        elapsed = None
+
+    try:
+        proc.wait(timeout=FIRST_PAINT_TIMEOUT_SECONDS if elapsed is not None else 0)
+    except subprocess.TimeoutExpired:
+        # Приложение зависло: завершаем процесс, чтобы замер не ждал бесконечно
+        proc.kill()
+        proc.wait()
+    proc.stdout.close()
+    return elapsed
+
+
+def measure_imports(app_dir, script, extra_args):
+    """Самые медленные импорты по данным -X importtime: [(мкс, модуль)]"""
+    env = dict(os.environ, LAB_STARTUP_BENCH="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", script, *extra_args],
+        cwd=os.path.join(ROOT, app_dir),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        # Формат: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Учитываем только импорты верхнего уровня
+        if name.startswith("  "):
+            continue
+        imports.append((int(cumulative), name.strip()))
+    imports.sort(reverse=True)
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени запуска приложений")
+    parser.add_argument("--runs", type=int, default=5, help="количество запусков каждого приложения")
+    parser.add_argument("--sync-start", action="store_true", help="замерить старый синхронный запуск")
+    args = parser.parse_args()
+
+    extra_args = ["--sync-start"] if args.sync_start else []
+    over_budget = False
+
+    for app_dir, script in APPS:
+        print(f"== {app_dir}/{script}")
+
+        imports = measure_imports(app_dir, script, extra_args)
+        total_us = sum(us for us, _ in imports)
+        print(f"  импорты: {total_us / 1000:.1f} мс")
+        for us, name in imports[:TOP_IMPORTS]:
+            print(f"    {us / 1000:8.1f} мс  {name}")
+
+        timings = [measure_first_paint(app_dir, script, extra_args) for _ in range(args.runs)]
+        if None in timings:
+            print("  первая отрисовка: окно не появилось")
+            over_budget = True
+            continue
+
+        median = statistics.median(timings)
+        status = "OK" if median <= FIRST_PAINT_BUDGET_MS else "ПРЕВЫШЕН БЮДЖЕТ"
+        print(f"  первая отрисовка: медиана {median:.0f} мс, мин {min(timings):.0f} мс, "
+              f"бюджет {FIRST_PAINT_BUDGET_MS} мс - {status}")
+        if median > FIRST_PAINT_BUDGET_MS:
+            over_budget = True
+
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Модули приложения 10 импортируются без пакета, общие модули лежат в корне
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "10"))
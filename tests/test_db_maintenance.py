@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+from contextlib import closing
+
+import pytest
+
+import db_maintenance
+from db_maintenance import MaintenanceRun, MaintenanceTarget, run_maintenance
+
+# Бесконечный запрос: выполняется, пока его не прервет progress handler
+ENDLESS = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+@pytest.fixture
+def target(tmp_path):
+    path = str(tmp_path / "items.db")
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.executemany("INSERT INTO items (name) VALUES (?)", [(f"item {i}" * 20,) for i in range(2000)])
+        conn.commit()
+        conn.execute("DELETE FROM items WHERE id % 2 = 0")
+        conn.commit()
+    return MaintenanceTarget(path, "SELECT * FROM items ORDER BY name")
+
+
+def test_all_steps(target):
+    line = MaintenanceRun(target).run()
+    for action in ("analyze", "checkpoint", "vacuum", "quick_check ok"):
+        assert action in line
+    assert "пропущен" not in line
+
+
+def test_over_budget_step_skips_only_itself(target, monkeypatch):
+    monkeypatch.setattr(db_maintenance, "STEP_BUDGET_SECONDS", 0.05)
+    run = MaintenanceRun(target)
+    run.optimize = lambda conn: run.step(conn, ENDLESS)
+
+    line = run.run()
+    assert "optimize пропущен" in line
+    for action in ("checkpoint", "vacuum", "quick_check ok"):
+        assert action in line
+
+
+def test_cancel_stops_run(target):
+    cancel = threading.Event()
+    run = MaintenanceRun(target, cancel)
+
+    def optimize(conn):
+        cancel.set()
+        run.step(conn, ENDLESS)
+
+    run.optimize = optimize
+    line = run.run()
+    assert "прервано" in line
+    assert "quick_check" not in line
+
+
+def test_probe_is_bounded(target):
+    run = MaintenanceRun(target._replace(probe_query=ENDLESS.replace("SELECT COUNT(*) FROM c", "SELECT x FROM c")))
+    with closing(sqlite3.connect(target.path)) as conn:
+        conn.set_progress_handler(run.check_budget, db_maintenance.PROGRESS_OPCODES)
+        assert run.probe_latency(conn) is not None
+
+
+def test_quick_check_schedule(target):
+    quick_checks = {}
+    first, = run_maintenance([target], quick_checks=quick_checks)
+    second, = run_maintenance([target], quick_checks=quick_checks)
+    assert "quick_check ok" in first
+    assert "quick_check" not in second
+    assert target.path in quick_checks
@@ -0,0 +1,33 @@
+import pytest
+
+from lab_profiler import Profiler
+
+
+def test_measure_counts_failures():
+    profiler = Profiler()
+    with profiler.measure("save"):
+        pass
+    with pytest.raises(ValueError):
+        with profiler.measure("save"):
+            raise ValueError
+
+    stats = profiler.snapshot()["save"]
+    assert (stats["count"], stats["errors"]) == (2, 1)
+
+
+def test_sqlalchemy_failed_statement():
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from sqlalchemy.exc import OperationalError
+
+    profiler = Profiler()
+    engine = sqlalchemy.create_engine("sqlite://")
+    profiler.attach_sqlalchemy(engine)
+
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("SELECT * FROM missing")
+        conn.exec_driver_sql("SELECT 1")
+
+    stats = profiler.snapshot()["sql"]
+    assert (stats["count"], stats["errors"]) == (2, 1)
+    assert [entry["failed"] for entry in profiler.sql_log] == [True, False]
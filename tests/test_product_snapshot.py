@@ -0,0 +1,130 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from product_snapshot import CHANGE_COUNTER_SQL, ProductSnapshot, SnapshotCache, write_snapshot
+from sharded_catalog import CREATE_TABLE
+
+ROWS = [
+    (3, "Книга Python", "Книги", 1200.0, 30),
+    (5, "Кофеварка", "Бытовая техника", 5000.0, 15),
+    (7, "Мышь компьютерная", "Аксессуары", 800.0, 40),
+    (2, "Наушники", "Аксессуары", 3500.0, 50),
+    (1, "Ноутбук", "Электроника", 45000.0, 10),
+    (9, "Подарок", None, 100.0, None),
+]
+
+
+def read(path):
+    snapshot = ProductSnapshot(str(path))
+    try:
+        return snapshot.count, snapshot.stamp, [tuple(row) for row in snapshot.products()]
+    finally:
+        snapshot.close()
+
+
+def make_database(path, rows=ROWS):
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute(CREATE_TABLE)
+        conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?)", rows)
+        for sql in CHANGE_COUNTER_SQL:
+            conn.execute(sql)
+        conn.commit()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    db_path = str(tmp_path / "products.db")
+    make_database(db_path)
+    cache = SnapshotCache(db_path, str(tmp_path / "products.snapshot"))
+    yield cache
+    cache.close()
+
+
+def execute(db_path, sql, params=()):
+    with closing(sqlite3.connect(db_path, isolation_level=None)) as conn:
+        conn.execute(sql, params)
+
+
+def test_write_read_round_trip(tmp_path):
+    path = tmp_path / "products.snapshot"
+    write_snapshot(str(path), ROWS, ["abc", 4])
+
+    count, stamp, rows = read(path)
+    assert count == len(ROWS)
+    assert stamp == ["abc", 4]
+    # Пустое количество хранится как 0
+    assert rows == [row[:4] + (row[4] or 0,) for row in ROWS]
+
+
+def test_category_index(tmp_path):
+    path = tmp_path / "products.snapshot"
+    write_snapshot(str(path), ROWS, ["abc", 0])
+
+    snapshot = ProductSnapshot(str(path))
+    try:
+        assert [row.name for row in snapshot.products("Аксессуары")] == ["Мышь компьютерная", "Наушники"]
+        assert [row.id for row in snapshot.products("Электроника")] == [1]
+        assert snapshot.products("Нет такой") == []
+        assert snapshot.category(5) is None
+    finally:
+        snapshot.close()
+
+
+def test_empty_table(tmp_path):
+    path = tmp_path / "products.snapshot"
+    write_snapshot(str(path), [], ["abc", 0])
+    assert read(path) == (0, ["abc", 0], [])
+
+
+def test_cache_builds_and_reuses(cache):
+    assert cache.current() is None
+    snapshot = cache.get()
+    assert [row.name for row in snapshot.products()] == sorted(row[1] for row in ROWS)
+    assert cache.current() is snapshot
+
+
+def test_external_write_invalidates(cache):
+    cache.get()
+    execute(cache.db_path, "UPDATE products SET quantity = 0 WHERE id = 1")
+    assert cache.current() is None
+
+    # Снимок на диске тоже устарел: после перезапуска он не используется
+    reopened = SnapshotCache(cache.db_path, cache.snapshot_path)
+    assert reopened.current() is None
+    reopened.close()
+
+    snapshot = cache.get()
+    assert snapshot.products("Электроника")[0].quantity == 0
+
+
+def test_maintenance_keeps_snapshot(cache):
+    snapshot = cache.get()
+    execute(cache.db_path, "ANALYZE")
+    execute(cache.db_path, "VACUUM")
+    assert cache.current() is snapshot
+
+
+def test_build_in_background(cache):
+    execute(cache.db_path, "DELETE FROM products WHERE category = 'Книги'")
+    cache.build_in_background()
+    cache.builder.join()
+
+    snapshot = cache.current()
+    assert snapshot is not None
+    assert "Книга Python" not in [row.name for row in snapshot.products()]
+
+
+def test_database_without_counter(tmp_path):
+    db_path = str(tmp_path / "old.db")
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute(CREATE_TABLE)
+        conn.commit()
+
+    cache = SnapshotCache(db_path, str(tmp_path / "old.snapshot"))
+    try:
+        assert cache.build() is False
+        assert cache.get() is None
+    finally:
+        cache.close()
@@ -0,0 +1,32 @@
+import importlib.util
+import os
+import threading
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location("products_app", os.path.join(ROOT, "10", "10.py"))
+products_app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(products_app)
+
+SQLAlchemyApp = products_app.SQLAlchemyApp
+
+
+def make_app(ready, error=None):
+    """Приложение без окна: таблица с выделенной строкой, сессии еще нет"""
+    app = SimpleNamespace(db_ready=threading.Event(), db_error=error, session=None, catalog=None)
+    if ready:
+        app.db_ready.set()
+    app.tree = SimpleNamespace(selection=lambda: ("I001",), item=lambda item: {"values": [1]})
+    app.database_available = lambda: SQLAlchemyApp.database_available(app)
+    return app
+
+
+def test_no_product_before_database_ready():
+    # Строки из снимка уже показаны, а сессия SQLAlchemy еще не создана
+    assert SQLAlchemyApp.get_selected_product(make_app(ready=False)) is None
+
+
+def test_no_product_after_database_error():
+    app = make_app(ready=True, error=OSError("нет доступа"))
+    assert SQLAlchemyApp.get_selected_product(app) is None
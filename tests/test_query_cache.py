@@ -0,0 +1,83 @@
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 10.py нельзя импортировать по имени: загружаем его как модуль из файла
+spec = importlib.util.spec_from_file_location("products_app", os.path.join(ROOT, "10", "10.py"))
+products_app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(products_app)
+
+ProductQueryCache = products_app.ProductQueryCache
+QueryPathStats = products_app.QueryPathStats
+
+
+class Loader:
+    """loader для кэша, считающий обращения к "БД" """
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [f"результат {self.calls}"]
+
+
+def test_hits_and_misses():
+    cache = ProductQueryCache()
+    loader = Loader()
+
+    first = cache.get("all", (None, None, "name", None), loader)
+    second = cache.get("all", (None, None, "name", None), loader)
+    cache.get("category", ("Книги", None, "name", None), loader)
+
+    assert second is first
+    assert loader.calls == 2
+    assert (cache.stats["all"].hits, cache.stats["all"].misses) == (1, 1)
+    assert (cache.stats["category"].hits, cache.stats["category"].misses) == (0, 1)
+    assert cache.stats["all"].hit_rate() == pytest.approx(0.5)
+
+
+def test_note_write_invalidates():
+    cache = ProductQueryCache()
+    loader = Loader()
+    key = (None, None, "name", None)
+
+    cache.get("all", key, loader)
+    cache.note_write()
+    assert cache.get("all", key, loader) == ["результат 2"]
+    assert cache.get("all", key, loader) == ["результат 2"]
+    assert loader.calls == 2
+    assert cache.stats["all"].misses == 2
+
+
+def test_lru_eviction():
+    cache = ProductQueryCache(max_entries=2)
+    loader = Loader()
+
+    cache.get("category", "a", loader)
+    cache.get("category", "b", loader)
+    cache.get("category", "a", loader)  # "a" становится самой свежей записью
+    cache.get("category", "c", loader)  # вытесняется "b"
+
+    assert list(cache.entries) == ["a", "c"]
+    cache.get("category", "b", loader)
+    assert loader.calls == 4
+
+
+def test_time_saved_without_misses():
+    stats = QueryPathStats()
+    assert stats.time_saved() == 0.0
+    assert stats.hit_rate() == 0.0
+
+    stats.hits = 3
+    stats.hit_time = 0.001
+    assert stats.time_saved() == 0.0
+
+
+def test_report():
+    cache = ProductQueryCache()
+    cache.get("search", ("", "ноут", "name", None), Loader())
+    assert "search: попаданий 0, промахов 1" in cache.report()
@@ -0,0 +1,57 @@
+import csv
+
+from reports import generate_reports
+from sharded_catalog import MAX_SHARDS, ShardedCatalog
+
+PRODUCTS = [
+    ("Ноутбук", "Электроника", 45000.0, 2),
+    ("Смартфон", "Электроника", 25000.0, 5),
+    ("Книга Python", "Книги", 1200.0, 30),
+    ("Футболка", "Одежда", 800.0, 100),
+]
+
+
+def read_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_product_reports_over_shards(tmp_path):
+    catalog = ShardedCatalog(3, str(tmp_path / "shards"))
+    for row in PRODUCTS:
+        catalog.add(*row)
+
+    results = generate_reports(
+        ["inventory_by_category", "low_stock"], formats=("csv",), out_dir=str(tmp_path / "reports"),
+        low_stock=10, product_shards=catalog.paths,
+    )
+    (by_category, count), (low_stock, low_count) = results
+
+    assert count == 3
+    rows = {row[0]: row for row in read_csv(by_category)}
+    assert rows["Электроника"][1:4] == ["2", "7", "215000.00"]
+    assert low_count == 2
+    assert [row[1] for row in read_csv(low_stock)] == ["Ноутбук", "Смартфон"]
+
+
+def test_reports_use_given_database(tmp_path):
+    catalog = ShardedCatalog(1, str(tmp_path / "shards"))
+    catalog.add("Ноутбук", "Электроника", 45000.0, 2)
+
+    # Отчет по товарам строится по переданному файлу, а не по 10/products.db
+    (path, count), = generate_reports(
+        ["low_stock"], formats=("csv",), out_dir=str(tmp_path / "reports"), database=catalog.paths[0],
+    )
+    assert count == 1
+    assert read_csv(path)[0][1] == "Ноутбук"
+
+
+def test_reports_over_max_shards(tmp_path):
+    catalog = ShardedCatalog(MAX_SHARDS, str(tmp_path / "shards"))
+    for row in PRODUCTS:
+        catalog.add(*row)
+
+    (path, count), = generate_reports(
+        ["low_stock"], formats=("csv",), out_dir=str(tmp_path / "reports"), product_shards=catalog.paths,
+    )
+    assert count == 2
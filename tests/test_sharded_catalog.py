@@ -0,0 +1,157 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from sharded_catalog import COLUMNS, CREATE_TABLE, MAX_SHARDS, ShardCountMismatch, ShardedCatalog
+
+PRODUCTS = [
+    ("Ноутбук", "Электроника", 45000.0, 10),
+    ("Смартфон", "Электроника", 25000.0, 25),
+    ("Наушники", "Аксессуары", 3500.0, 50),
+    ("Книга Python", "Книги", 1200.0, 30),
+    ("Футболка", "Одежда", 800.0, 100),
+    ("Кофеварка", "Бытовая техника", 5000.0, 15),
+    ("Без категории", None, 100.0, 1),
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ShardedCatalog(3, str(tmp_path / "shards"))
+    yield catalog
+    catalog.close()
+
+
+def make_source(path, rows=PRODUCTS):
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute(CREATE_TABLE)
+        conn.executemany("INSERT INTO products (name, category, price, quantity) VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+
+
+def shard_names(catalog, shard):
+    with catalog.connect(shard) as conn:
+        return [row[0] for row in conn.execute("SELECT name FROM products")]
+
+
+def test_add_routes_by_category_and_id(catalog):
+    for name, category, price, quantity in PRODUCTS:
+        product_id = catalog.add(name, category, price, quantity)
+        shard = catalog.shard_for_category(category)
+        assert catalog.shard_for_id(product_id) == shard
+        assert name in shard_names(catalog, shard)
+
+    assert catalog.shard_for_category(None) == 0
+
+
+def test_get_round_trip(catalog):
+    product_id = catalog.add("Монитор", "Электроника", 18000.0, 8)
+    row = catalog.get(product_id)
+    assert tuple(row) == (product_id, "Монитор", "Электроника", 18000.0, 8)
+    assert catalog.get(product_id + catalog.shard_count) is None
+
+
+def test_products_merged_by_name(catalog):
+    for row in PRODUCTS:
+        catalog.add(*row)
+
+    names = [row.name for row in catalog.products()]
+    assert names == sorted(row[0] for row in PRODUCTS)
+
+    electronics = catalog.products(category="Электроника")
+    assert [row.name for row in electronics] == ["Ноутбук", "Смартфон"]
+    assert [row.name for row in catalog.products(search_term="фон")] == ["Смартфон"]
+
+
+def test_stats_and_categories(catalog):
+    for row in PRODUCTS:
+        catalog.add(*row)
+
+    count, total_value, average_price = catalog.stats()
+    assert count == len(PRODUCTS)
+    assert total_value == sum(price * quantity for _, _, price, quantity in PRODUCTS)
+    assert average_price == pytest.approx(sum(row[2] for row in PRODUCTS) / len(PRODUCTS))
+    assert catalog.categories() == sorted({row[1] for row in PRODUCTS if row[1]})
+
+
+def test_update_moves_product_between_shards(catalog):
+    product_id = catalog.add("Ноутбук", "Электроника", 45000.0, 10)
+    target = next(
+        category for category in ("Книги", "Одежда", "Аксессуары", "Бытовая техника")
+        if catalog.shard_for_category(category) != catalog.shard_for_id(product_id)
+    )
+
+    new_id = catalog.update(product_id, "Ноутбук", target, 40000.0, 5)
+    assert new_id != product_id
+    assert catalog.get(product_id) is None
+    assert catalog.get(new_id).category == target
+
+
+def test_failed_move_keeps_product(catalog, monkeypatch):
+    product_id = catalog.add("Ноутбук", "Электроника", 45000.0, 10)
+    target = next(
+        category for category in ("Книги", "Одежда", "Аксессуары", "Бытовая техника")
+        if catalog.shard_for_category(category) != catalog.shard_for_id(product_id)
+    )
+
+    def add(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(catalog, "add", add)
+    with pytest.raises(sqlite3.OperationalError):
+        catalog.update(product_id, "Ноутбук", target, 40000.0, 5)
+    assert catalog.get(product_id).category == "Электроника"
+
+
+def test_migrate_runs_once(tmp_path, catalog):
+    source = str(tmp_path / "products.db")
+    make_source(source)
+
+    assert catalog.migrate(source) == len(PRODUCTS)
+    assert sorted(row.name for row in catalog.products()) == sorted(row[0] for row in PRODUCTS)
+
+    # Отметка о переносе сохраняется: пустые шарды не заполняются повторно
+    for shard in range(catalog.shard_count):
+        with catalog.connect(shard) as conn:
+            conn.execute("DELETE FROM products")
+            conn.commit()
+    reopened = ShardedCatalog(3, catalog.directory)
+    assert reopened.migrate(source) is None
+    assert reopened.products() == []
+    reopened.close()
+
+
+def test_migrate_without_source(tmp_path, catalog):
+    assert catalog.migrate(str(tmp_path / "missing.db")) == 0
+    assert catalog.is_migrated()
+
+
+def test_other_shard_count_refused(catalog):
+    with pytest.raises(ShardCountMismatch):
+        ShardedCatalog(2, catalog.directory)
+    with pytest.raises(ShardCountMismatch):
+        ShardedCatalog(4, catalog.directory)
+    ShardedCatalog(3, catalog.directory)
+
+
+def test_legacy_catalog_without_meta(tmp_path):
+    directory = tmp_path / "shards"
+    directory.mkdir()
+    for shard in range(2):
+        with closing(sqlite3.connect(directory / f"products_{shard}.db")) as conn:
+            conn.execute(CREATE_TABLE)
+            conn.execute(f"INSERT INTO products ({COLUMNS}) VALUES (?, 'Товар', NULL, 1.0, 1)", (shard,))
+            conn.commit()
+
+    with pytest.raises(ShardCountMismatch):
+        ShardedCatalog(3, str(directory))
+
+    catalog = ShardedCatalog(2, str(directory))
+    assert catalog.is_migrated()
+    assert catalog.migrate(str(tmp_path / "products.db")) is None
+
+
+def test_shard_count_limited_by_attach(tmp_path):
+    with pytest.raises(ValueError):
+        ShardedCatalog(MAX_SHARDS + 1, str(tmp_path / "shards"))